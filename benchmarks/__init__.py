@@ -0,0 +1,5 @@
+"""Microbenchmarks for the pitch tracking engine.
+
+Each module can be run on its own, e.g. `python -m benchmarks.capture`, and
+prints its results as a table. None of them need an audio device.
+"""
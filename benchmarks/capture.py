@@ -0,0 +1,61 @@
+"""Measures how many audio callbacks per second the capture path can sustain.
+
+Compares the original `bytes` concatenation against the preallocated
+`RingBuffer`. Only the buffering is measured, frequency detection is excluded.
+"""
+
+from timeit import timeit
+
+import numpy as np
+
+from engine.ring_buffer import RingBuffer
+
+
+SAMPLE_RATE = 44100
+WINDOW_SIZE = 0.6
+FRAMES_PER_BUFFER = 2**9
+CALLBACKS = 10_000
+
+
+def bytes_capture(blocks: list[bytes]):
+    """The original capture path, growing and slicing a `bytes` object."""
+    target_length = int(SAMPLE_RATE * WINDOW_SIZE)
+    buffer = bytes()
+    buffer_length = 0
+    for in_data in blocks:
+        np.frombuffer(in_data, dtype=np.float32)
+        buffer += in_data
+        buffer_length += FRAMES_PER_BUFFER
+        if buffer_length >= target_length:
+            buffer = buffer[-target_length * 4 :]
+            buffer_length = target_length
+            np.frombuffer(buffer, dtype=np.float32)
+
+
+def ring_capture(blocks: list[bytes]):
+    """The ring buffer capture path."""
+    buffer = RingBuffer(int(SAMPLE_RATE * WINDOW_SIZE))
+    for in_data in blocks:
+        buffer.write(np.frombuffer(in_data, dtype=np.float32))
+        if buffer.full:
+            buffer.view()
+
+
+def main():
+    rng = np.random.default_rng(0)
+    blocks = [
+        rng.uniform(-1.0, 1.0, FRAMES_PER_BUFFER).astype(np.float32).tobytes()
+        for _ in range(CALLBACKS)
+    ]
+
+    print(f"{'capture path':<16}{'callbacks/s':>16}{'real-time x':>16}")
+    for name, capture in (("bytes", bytes_capture), ("ring buffer", ring_capture)):
+        seconds = timeit(lambda: capture(blocks), number=1)
+        rate = CALLBACKS / seconds
+        # How many times faster than the audio device produces callbacks
+        realtime = rate / (SAMPLE_RATE / FRAMES_PER_BUFFER)
+        print(f"{name:<16}{rate:>16,.0f}{realtime:>16,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Compares the cost of tracking several channels at once.
+
+A single `SoundManager` listening to every channel analyses all of their
+windows in one batch, against a separate `SoundManager` per channel each
+analysing its own. Every channel plays a different note, fed through offline
+exactly as it would arrive from a multi-input audio interface.
+"""
+
+from time import perf_counter
+
+import numpy as np
+
+from engine import SoundManager, offset_to_frequency
+from engine.synth import pluck
+
+
+SAMPLE_RATE = 44100
+BLOCK_SIZE = 2**9
+DURATION = 2.0
+CHANNELS = (1, 2, 4, 8)
+
+
+def feed(sound_manager: SoundManager, samples: np.ndarray) -> float:
+    """Feeds samples to the sound manager block by block, returning the
+    seconds taken."""
+    blocks = [
+        samples[start : start + BLOCK_SIZE]
+        for start in range(0, len(samples), BLOCK_SIZE)
+    ]
+    start = perf_counter()
+    for block in blocks:
+        sound_manager.feed(block)
+    return perf_counter() - start
+
+
+def main():
+    rng = np.random.default_rng(0)
+    # A different note on each channel, from the low E upwards
+    signal = np.stack(
+        [
+            pluck(
+                offset_to_frequency(-29 + 5 * channel),
+                SAMPLE_RATE,
+                duration=DURATION,
+                decay=8.0,
+                noise=0.01,
+                rng=rng,
+            )
+            for channel in range(max(CHANNELS))
+        ],
+        axis=1,
+    ).astype(np.float32)
+
+    print(
+        f"{'channels':<10}{'batched ms/s':>14}{'separate ms/s':>15}"
+        f"{'batched x1':>12}{'separate x1':>13}"
+    )
+    batched_single = None
+    separate_single = None
+    for channels in CHANNELS:
+        batched = SoundManager()
+        batched.connect_offline(SAMPLE_RATE, channels)
+        batched_time = feed(batched, np.ascontiguousarray(signal[:, :channels]))
+
+        separate_time = 0.0
+        for channel in range(channels):
+            separate = SoundManager()
+            separate.connect_offline(SAMPLE_RATE)
+            separate_time += feed(separate, np.ascontiguousarray(signal[:, channel]))
+
+        if batched_single is None or separate_single is None:
+            batched_single = batched_time
+            separate_single = separate_time
+
+        # Milliseconds of compute per second of audio, and how many times the
+        # cost of a single channel that is
+        print(
+            f"{channels:<10}"
+            f"{batched_time / DURATION * 1000:>14.1f}"
+            f"{separate_time / DURATION * 1000:>15.1f}"
+            f"{batched_time / batched_single:>12.2f}"
+            f"{separate_time / separate_single:>13.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
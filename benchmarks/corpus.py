@@ -0,0 +1,189 @@
+"""Runs the pitch tracker over a synthetic corpus of every (string, fret)
+position of an instrument.
+
+Each note is fed through `SoundManager` offline, exactly as it would arrive
+from an audio device. Notes are played one after another like a chromatic run
+up each string, so every pluck cuts off the previous note while it is still
+ringing and the window has to let go of it. For every position this reports:
+
+- the time from the pluck to the first reading with the correct offset
+- the mean compute time of each analysed window
+- the median error of the correct readings, in cents
+
+Run `python -m benchmarks.corpus --help` for the corpus and detector options.
+"""
+
+from argparse import ArgumentParser
+from dataclasses import dataclass
+
+import numpy as np
+
+from engine import Detector, Instrument, SoundManager, frequency_to_offset
+from engine.latency import Stage
+from engine.synth import Rendering, corpus
+
+
+SAMPLE_RATE = 44100
+BLOCK_SIZE = 2**9
+# Silence before each run of notes, long enough to fill the longest window
+LEAD_IN = 1.0
+# How long the previous note rings before each pluck
+PREVIOUS = 0.5
+
+
+@dataclass
+class Result:
+    """How the pitch tracker fared on a single rendering."""
+
+    rendering: Rendering
+    # Seconds from the pluck to the first correct reading, if there was one
+    time_to_correct: float | None
+    # Mean seconds spent analysing each window
+    window_time: float
+    # Median absolute error of the correct readings
+    cents: float | None
+
+
+def run(
+    sound_manager: SoundManager,
+    rendering: Rendering,
+    previous: Rendering,
+    block_size: int = BLOCK_SIZE,
+) -> Result:
+    """Feeds a rendering through the sound manager, straight after the
+    previous one."""
+    sound_manager.connect_offline(SAMPLE_RATE)
+
+    lead_in = np.concatenate(
+        (
+            np.zeros(int(SAMPLE_RATE * LEAD_IN), dtype=np.float32),
+            previous.samples[: int(SAMPLE_RATE * PREVIOUS)],
+        )
+    )
+    for start in range(0, len(lead_in), block_size):
+        sound_manager.feed(lead_in[start : start + block_size])
+
+    # Only the new note is timed
+    sound_manager.latency.clear()
+
+    time_to_correct = None
+    errors = []
+    samples = rendering.samples
+    for start in range(0, len(samples), block_size):
+        sound_manager.feed(samples[start : start + block_size])
+
+        frequency = sound_manager.frequency
+        if frequency is None or frequency_to_offset(frequency) != rendering.offset:
+            continue
+
+        if time_to_correct is None:
+            time_to_correct = (start + block_size) / SAMPLE_RATE
+        errors.append(abs(1200 * np.log2(frequency / rendering.frequency)))
+
+    analysis_times = sound_manager.latency.durations(Stage.ANALYSIS)
+    return Result(
+        rendering,
+        time_to_correct,
+        float(np.mean(analysis_times)) if len(analysis_times) > 0 else 0.0,
+        float(np.median(errors)) if len(errors) > 0 else None,
+    )
+
+
+def main():
+    parser = ArgumentParser(prog="python -m benchmarks.corpus")
+    parser.add_argument(
+        "--instrument",
+        choices=list(Instrument.__members__.keys()),
+        action="append",
+        help="defaults to every instrument",
+    )
+    parser.add_argument(
+        "--detector",
+        choices=list(Detector.__members__.keys()),
+        default=Detector.HPS.name,
+    )
+    parser.add_argument(
+        "--resolutions",
+        type=int,
+        default=SoundManager.resolutions,
+        help="window lengths to analyse at, 1 for a single window",
+    )
+    parser.add_argument(
+        "--no-onsets",
+        action="store_true",
+        help="keep the window running through each pluck",
+    )
+    parser.add_argument("--duration", type=float, default=1.5)
+    parser.add_argument("--decay", type=float, default=8.0)
+    parser.add_argument("--noise", type=float, default=0.01)
+    parser.add_argument("--detune", type=float, default=10.0)
+    parser.add_argument("--summary", action="store_true", help="totals only")
+    args = parser.parse_args()
+
+    instruments = [
+        Instrument[name] for name in args.instrument or Instrument.__members__
+    ]
+
+    sound_manager = SoundManager()
+    sound_manager.detector = Detector[args.detector]
+    sound_manager.resolutions = args.resolutions
+    sound_manager.onsets = not args.no_onsets
+
+    for instrument in instruments:
+        sound_manager.instrument = instrument
+        renderings = list(
+            corpus(
+                instrument,
+                SAMPLE_RATE,
+                duration=args.duration,
+                decay=args.decay,
+                noise=args.noise,
+                detune=args.detune,
+            )
+        )
+        # The first note follows on from the last
+        results = [
+            run(sound_manager, rendering, renderings[i - 1])
+            for i, rendering in enumerate(renderings)
+        ]
+
+        print(
+            f"{instrument.value.name}, {args.detector}, "
+            f"{args.resolutions} resolution(s)"
+            f"{'' if sound_manager.onsets else ', no onsets'}"
+        )
+        if not args.summary:
+            print(
+                f"{'string':>8}{'fret':>6}{'offset':>8}"
+                f"{'to correct ms':>15}{'ms/window':>11}{'cents':>8}"
+            )
+            for result in results:
+                time = result.time_to_correct
+                cents = result.cents
+                print(
+                    f"{result.rendering.string + 1:>8}"
+                    f"{result.rendering.fret:>6}"
+                    f"{result.rendering.offset:>8}"
+                    f"{time * 1000 if time is not None else float('nan'):>15.0f}"
+                    f"{result.window_time * 1000:>11.3f}"
+                    f"{cents if cents is not None else float('nan'):>8.2f}"
+                )
+
+        times = [r.time_to_correct for r in results if r.time_to_correct is not None]
+        cents = [r.cents for r in results if r.cents is not None]
+        if len(times) == 0:
+            print(f"detected 0/{len(results)}")
+            print()
+            continue
+        print(
+            f"detected {len(times)}/{len(results)}, "
+            f"median to correct {np.median(times) * 1000:.0f}ms, "
+            f"p95 {np.percentile(times, 95) * 1000:.0f}ms, "
+            f"{np.mean([r.window_time for r in results]) * 1000:.3f}ms/window, "
+            f"median error {np.median(cents):.2f} cents"
+        )
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""Measures how long the pitch tracker takes to broadcast each note of the
+synthetic corpus, once its readings have been debounced.
+
+Every reading is passed through two debouncers side by side: the time-based
+`Debouncer` the sound manager uses, and the old debouncer that waited for the
+same offset on 5 readings in a row. Notes follow on from one another like in
+`benchmarks.corpus`, and the whole corpus is run at several block sizes, since
+the old debouncer's delay depends on how often readings arrive. For each
+debouncer this reports the distribution of the time from the pluck to the
+broadcast of the correct offset, and how many wrong offsets were broadcast
+along the way.
+
+Run `python -m benchmarks.debounce --help` for the options.
+"""
+
+from argparse import ArgumentParser
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from engine import Detector, Instrument, SoundManager, frequency_to_offset
+from engine.debouncer import Debouncer
+from engine.synth import Rendering, corpus
+
+
+SAMPLE_RATE = 44100
+BLOCK_SIZES = (2**8, 2**9, 2**10)
+# Silence before each run of notes, long enough to fill the longest window
+LEAD_IN = 1.0
+# How long the previous note rings before each pluck
+PREVIOUS = 0.5
+
+
+class FrameCounter:
+    """The old debouncer, which broadcast an offset once it had been read 5
+    times in a row."""
+
+    def __init__(self, frames: int = 5):
+        self.frames = frames
+        self.offset: int | None = None
+        self.broadcasted: int | None = None
+        self._counter = 0
+
+    def update(self, frequency: float | None, _time: float) -> bool:
+        offset = frequency_to_offset(frequency) if frequency is not None else None
+        if offset == self.offset:
+            self._counter += 1
+        else:
+            self.offset = offset
+            self._counter = 0
+
+        if self._counter >= self.frames and self.offset != self.broadcasted:
+            self.broadcasted = self.offset
+            return True
+        return False
+
+
+@dataclass
+class Results:
+    """How a debouncer fared over the corpus."""
+
+    # Seconds from each pluck to the broadcast of its offset
+    times: list[float] = field(default_factory=list)
+    # Notes whose offset was never broadcast
+    missed: int = 0
+    # Broadcasts of any other note after a pluck
+    wrong: int = 0
+
+
+def run(
+    sound_manager: SoundManager,
+    debouncers: list[Debouncer | FrameCounter],
+    results: list[Results],
+    rendering: Rendering,
+    previous: Rendering,
+    block_size: int,
+):
+    """Feeds a rendering through the sound manager straight after the previous
+    one, passing every reading through each debouncer."""
+    sound_manager.connect_offline(SAMPLE_RATE)
+
+    lead_in = np.concatenate(
+        (
+            np.zeros(int(SAMPLE_RATE * LEAD_IN), dtype=np.float32),
+            previous.samples[: int(SAMPLE_RATE * PREVIOUS)],
+        )
+    )
+    samples = rendering.samples
+    # The stream time of the pluck
+    pluck = len(lead_in) / SAMPLE_RATE
+
+    times: list[float | None] = [None] * len(debouncers)
+    signal = np.concatenate((lead_in, samples))
+    for start in range(0, len(signal), block_size):
+        sound_manager.feed(signal[start : start + block_size])
+        # Each reading is made once its block has been captured
+        time = (start + block_size) / SAMPLE_RATE
+
+        for i, debouncer in enumerate(debouncers):
+            if not debouncer.update(sound_manager.frequency, time) or time < pluck:
+                continue
+            if debouncer.broadcasted == rendering.offset:
+                if times[i] is None:
+                    times[i] = time - pluck
+            elif debouncer.broadcasted is not None:
+                results[i].wrong += 1
+
+    for result, time in zip(results, times):
+        if time is None:
+            result.missed += 1
+        else:
+            result.times.append(time)
+
+
+def main():
+    parser = ArgumentParser(prog="python -m benchmarks.debounce")
+    parser.add_argument(
+        "--instrument",
+        choices=list(Instrument.__members__.keys()),
+        default=Instrument.GUITAR.name,
+    )
+    parser.add_argument(
+        "--detector",
+        choices=list(Detector.__members__.keys()),
+        default=Detector.HPS.name,
+    )
+    parser.add_argument(
+        "--block-size",
+        type=int,
+        action="append",
+        help=f"defaults to {', '.join(str(size) for size in BLOCK_SIZES)}",
+    )
+    parser.add_argument("--duration", type=float, default=1.5)
+    parser.add_argument("--decay", type=float, default=8.0)
+    parser.add_argument("--noise", type=float, default=0.01)
+    parser.add_argument("--detune", type=float, default=10.0)
+    args = parser.parse_args()
+
+    detector = Detector[args.detector]
+    sound_manager = SoundManager()
+    sound_manager.detector = detector
+    sound_manager.instrument = Instrument[args.instrument]
+
+    renderings = list(
+        corpus(
+            sound_manager.instrument,
+            SAMPLE_RATE,
+            duration=args.duration,
+            decay=args.decay,
+            noise=args.noise,
+            detune=args.detune,
+        )
+    )
+
+    print(f"{sound_manager.instrument.value.name}, {args.detector}")
+    print(
+        f"{'block':>6}{'debouncer':>12}{'median ms':>11}{'p95 ms':>8}"
+        f"{'p99 ms':>8}{'missed':>8}{'wrong':>7}"
+    )
+    for block_size in args.block_size or BLOCK_SIZES:
+        names = ("5 frames", f"{detector.value.hold * 1000:.0f}ms")
+        results = [Results() for _ in names]
+        for i, rendering in enumerate(renderings):
+            # Fresh debouncers for each note, as the sound manager is
+            # reconnected for each one
+            debouncers = [
+                FrameCounter(),
+                Debouncer(
+                    detector.value.hold,
+                    detector.value.tolerance,
+                    detector.value.hysteresis,
+                ),
+            ]
+            # The first note follows on from the last
+            run(
+                sound_manager,
+                debouncers,
+                results,
+                rendering,
+                renderings[i - 1],
+                block_size,
+            )
+
+        for name, result in zip(names, results):
+            times = np.array(result.times) * 1000
+            print(
+                f"{block_size:>6}{name:>12}"
+                f"{np.median(times):>11.0f}"
+                f"{np.percentile(times, 95):>8.0f}"
+                f"{np.percentile(times, 99):>8.0f}"
+                f"{result.missed:>8}{result.wrong:>7}"
+            )
+
+
+if __name__ == "__main__":
+    main()
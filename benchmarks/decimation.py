@@ -0,0 +1,79 @@
+"""Compares the CPU time spent per second of audio with and without
+decimating the audio before analysis.
+
+A run of notes up each instrument is fed through `SoundManager` offline at
+44.1kHz and 48kHz, timing everything from the capture callback to the
+delivered reading, so the cost of the decimation itself is included. The
+length of the longest window, and the padded FFT it is transformed with, are
+reported alongside.
+"""
+
+from time import perf_counter
+
+import numpy as np
+
+from engine import Detector, Instrument, SoundManager
+from engine.synth import corpus
+
+
+BLOCK_SIZE = 2**9
+SAMPLE_RATES = (44100, 48000)
+
+
+def feed(sound_manager: SoundManager, samples: np.ndarray) -> float:
+    """Feeds samples to the sound manager block by block, returning the
+    seconds taken."""
+    blocks = [
+        samples[start : start + BLOCK_SIZE]
+        for start in range(0, len(samples), BLOCK_SIZE)
+    ]
+    start = perf_counter()
+    for block in blocks:
+        sound_manager.feed(block)
+    return perf_counter() - start
+
+
+def main():
+    print(
+        f"{'instrument':<12}{'rate':>7}{'decimate':>10}{'analysis Hz':>13}"
+        f"{'window':>8}{'FFT':>7}{'ms/s':>8}"
+    )
+    for instrument in Instrument:
+        for sample_rate in SAMPLE_RATES:
+            # Every fifth fret of every string
+            samples = np.concatenate(
+                [
+                    rendering.samples
+                    for rendering in corpus(
+                        instrument,
+                        sample_rate,
+                        frets=range(0, 25, 5),
+                        duration=0.5,
+                        decay=8.0,
+                        noise=0.01,
+                    )
+                ]
+            )
+            duration = len(samples) / sample_rate
+
+            for decimate in (False, True):
+                sound_manager = SoundManager()
+                sound_manager.instrument = instrument
+                sound_manager.detector = Detector.HPS
+                sound_manager.decimate = decimate
+                sound_manager.connect_offline(sample_rate)
+                seconds = feed(sound_manager, samples)
+
+                longest = sound_manager._detectors[-1]
+                print(
+                    f"{instrument.value.name:<12}{sample_rate:>7}"
+                    f"{'yes' if decimate else 'no':>10}"
+                    f"{sound_manager.analysis_rate:>13}"
+                    f"{longest.window_length:>8}"
+                    f"{longest.plan.padded_length:>7}"
+                    f"{seconds / duration * 1000:>8.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Compares the pitch detectors on compute time and accuracy.
+
+Each detector is given a window of its own preferred size, from the start of a
+synthesised pluck with some background noise, for every semitone from the
+bass's low E to the 24th fret of the guitar's high E.
+"""
+
+from timeit import timeit
+
+import numpy as np
+
+from engine.pitch_detector import Detector
+from engine.note import offset_to_frequency
+from engine.synth import pluck
+
+
+SAMPLE_RATE = 44100
+# E1 to E6
+OFFSETS = range(-41, 20)
+NOISE = 0.01
+REPEATS = 20
+
+
+def main():
+    print(
+        f"{'detector':<18}{'window ms':>10}{'ms/window':>11}"
+        f"{'correct %':>11}{'median cents':>14}"
+    )
+    for detector in Detector:
+        pitch_detector = detector.value(SAMPLE_RATE)
+        rng = np.random.default_rng(0)
+
+        errors = []
+        correct = 0
+        seconds = 0.0
+        for offset in OFFSETS:
+            expected = offset_to_frequency(offset)
+            window = pluck(
+                expected,
+                SAMPLE_RATE,
+                pitch_detector.window_size,
+                noise=NOISE,
+                rng=rng,
+            )
+
+            seconds += timeit(lambda: pitch_detector.detect(window), number=REPEATS)
+            frequency, _ = pitch_detector.detect(window)
+            if frequency is None:
+                continue
+
+            cents = 1200 * np.log2(frequency / expected)
+            errors.append(abs(cents))
+            if abs(cents) < 50:
+                correct += 1
+
+        print(
+            f"{detector.name:<18}"
+            f"{pitch_detector.window_size * 1000:>10.0f}"
+            f"{seconds / (REPEATS * len(OFFSETS)) * 1000:>11.3f}"
+            f"{correct / len(OFFSETS) * 100:>11.1f}"
+            f"{np.median(errors):>14.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
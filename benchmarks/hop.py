@@ -0,0 +1,126 @@
+"""Measures CPU usage against latency for each analysis hop.
+
+A chromatic run up every string of the instrument is fed through
+`SoundManager` offline, once for each of `SoundManager.hops`, the hops offered
+on the settings page. Offline, every analysis runs on the thread feeding the
+audio, so the process time spent feeding it is the whole cost of the pitch
+tracker. For each hop this reports:
+
+- analyses per second of audio, and the CPU time per second of audio
+- how stale the latest reading is after each block, in stream time, as the
+  audio since the last analysis hasn't been read yet
+- the time from each pluck to the first reading of the correct offset
+
+Run `python -m benchmarks.hop --help` for the options.
+"""
+
+from argparse import ArgumentParser
+from time import process_time
+
+import numpy as np
+
+from engine import Detector, Instrument, SoundManager, frequency_to_offset
+from engine.synth import corpus
+
+
+SAMPLE_RATE = 44100
+BLOCK_SIZE = 2**9
+# Silence before the run of notes, long enough to fill the longest window
+LEAD_IN = 1.0
+
+
+def main():
+    parser = ArgumentParser(prog="python -m benchmarks.hop")
+    parser.add_argument(
+        "--instrument",
+        choices=list(Instrument.__members__.keys()),
+        default=Instrument.GUITAR.name,
+    )
+    parser.add_argument(
+        "--detector",
+        choices=list(Detector.__members__.keys()),
+        default=Detector.HPS.name,
+    )
+    parser.add_argument("--frets", type=int, default=13)
+    parser.add_argument("--duration", type=float, default=0.5)
+    args = parser.parse_args()
+
+    instrument = Instrument[args.instrument]
+    renderings = list(
+        corpus(
+            instrument,
+            SAMPLE_RATE,
+            frets=range(args.frets),
+            duration=args.duration,
+            decay=8.0,
+            noise=0.01,
+            detune=10.0,
+        )
+    )
+    lead_in = np.zeros(int(SAMPLE_RATE * LEAD_IN), dtype=np.float32)
+    session = np.concatenate(
+        [lead_in] + [rendering.samples for rendering in renderings]
+    )
+    duration = len(session) / SAMPLE_RATE
+
+    # The frame each note is plucked on, and its offset
+    plucks = len(lead_in) + np.cumsum(
+        [0] + [len(rendering.samples) for rendering in renderings[:-1]]
+    )
+    offsets = [rendering.offset for rendering in renderings]
+
+    print(f"{instrument.value.name}, {args.detector}, {duration:.0f}s of audio")
+    print(
+        f"{'hop':<13}{'analyses/s':>11}{'cpu %':>7}"
+        f"{'age ms':>8}{'p95':>6}{'to correct ms':>15}{'p95':>6}{'missed':>8}"
+    )
+    for hop in SoundManager.hops:
+        sound_manager = SoundManager()
+        sound_manager.instrument = instrument
+        sound_manager.detector = Detector[args.detector]
+        sound_manager.hop = hop
+        sound_manager.connect_offline(SAMPLE_RATE)
+
+        # Stream time the latest reading was made at, after each block
+        analysed = 0.0
+        ages = []
+        times_to_correct: list[float | None] = [None] * len(renderings)
+
+        start_time = process_time()
+        for start in range(0, len(session), BLOCK_SIZE):
+            analyses = sound_manager.counters.analyses
+            sound_manager.feed(session[start : start + BLOCK_SIZE])
+            end = min(start + BLOCK_SIZE, len(session))
+            if sound_manager.counters.analyses > analyses:
+                analysed = sound_manager.time
+            if start < len(lead_in):
+                continue
+            ages.append(sound_manager.time - analysed)
+
+            # The note playing at the end of the block
+            note = np.searchsorted(plucks, end, side="right") - 1
+            frequency = sound_manager.frequency
+            if (
+                times_to_correct[note] is None
+                and frequency is not None
+                and frequency_to_offset(frequency) == offsets[note]
+            ):
+                times_to_correct[note] = (end - plucks[note]) / SAMPLE_RATE
+        cpu = process_time() - start_time
+
+        ages_ms = np.array(ages) * 1000
+        correct = np.array([time for time in times_to_correct if time is not None])
+        correct *= 1000
+        name = f"{hop * 1000:.0f}ms" if hop is not None else "every block"
+        print(
+            f"{name:<13}"
+            f"{sound_manager.counters.analyses / duration:>11.1f}"
+            f"{cpu / duration * 100:>7.1f}"
+            f"{np.mean(ages_ms):>8.1f}{np.percentile(ages_ms, 95):>6.0f}"
+            f"{np.median(correct):>15.0f}{np.percentile(correct, 95):>6.0f}"
+            f"{len(renderings) - len(correct):>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
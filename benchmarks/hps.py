@@ -0,0 +1,65 @@
+"""Compares the cost of the harmonic product spectrum step.
+
+The original path resampled the spectrum with `scipy.signal.resample` once per
+harmonic, which is an extra FFT and inverse FFT each, the `AnalysisPlan`
+downsamples by striding instead. Restricted to the band of fundamentals a
+guitar can play, the strided product only covers a fraction of the bins.
+"""
+
+from timeit import timeit
+
+import numpy as np
+import scipy as sp
+
+from engine import Instrument, offset_to_frequency
+from engine.analysis import AnalysisPlan
+
+
+SAMPLE_RATE = 44100
+WINDOW_SIZE = 0.6
+PADDED_SIZE = 0.9
+HARMONICS = 4
+REPEATS = 100
+
+
+def original_harmonic_product(signal: np.ndarray) -> np.ndarray:
+    """The original HPS from `SoundManager._read_frequency`."""
+    spectra = [
+        sp.signal.resample(signal, len(signal) // n) for n in range(1, HARMONICS + 1)
+    ]
+    target_length = min(map(len, spectra))
+    cropped_spectra = np.array(list(map(lambda s: s[:target_length], spectra)))
+    return np.prod(cropped_spectra, axis=0)
+
+
+def main():
+    plan = AnalysisPlan(SAMPLE_RATE, WINDOW_SIZE, PADDED_SIZE, HARMONICS)
+    rng = np.random.default_rng(0)
+    window = rng.uniform(-1.0, 1.0, plan.window_length).astype(np.float32)
+    magnitude = plan.transform(window)
+
+    guitar = Instrument.GUITAR.value
+    banded = AnalysisPlan(
+        SAMPLE_RATE,
+        WINDOW_SIZE,
+        PADDED_SIZE,
+        HARMONICS,
+        band=(
+            offset_to_frequency(guitar.lowest_pitch.offset),
+            offset_to_frequency(guitar.highest_pitch.offset),
+        ),
+    )
+
+    print(f"{'hps':<16}{'ms/window':>16}")
+    for name, harmonic_product in (
+        ("resample", original_harmonic_product),
+        ("strided", plan.harmonic_product),
+        ("strided, band", banded.harmonic_product),
+    ):
+        # The peak is searched for straight after
+        seconds = timeit(lambda: harmonic_product(magnitude).argmax(), number=REPEATS)
+        print(f"{name:<16}{seconds / REPEATS * 1000:>16.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Measures how long `import engine` takes, and what it drags in with it.
+
+Each import runs in a fresh interpreter, so nothing is already cached in
+`sys.modules`. NumPy is imported on its own first, as every part of the engine
+needs it anyway, and the engine's own cost is reported on top of it.
+
+The engine used to import pyglet's event and clock modules, asyncio and
+NumPy's random generators as soon as it was imported itself. The "eager" row
+imports those first, alongside the engine, for the cost of the engine as it
+was. This reports the distribution of each, and which of the GUI, audio and
+asyncio packages were imported along the way.
+
+Run `python -m benchmarks.imports --help` for the options.
+"""
+
+import subprocess
+import sys
+from argparse import ArgumentParser
+
+import numpy as np
+
+
+# Packages that a batch job or server shouldn't need to load
+HEAVY = ("pyglet", "pyaudio", "asyncio")
+
+# What the engine imported up front, before it put them off until needed
+EAGER = """
+import asyncio
+import numpy.random
+import pyglet.clock
+import pyglet.event
+"""
+
+SCRIPT = """
+import sys
+from time import perf_counter
+
+start = perf_counter()
+import numpy
+middle = perf_counter()
+{prelude}
+import engine
+end = perf_counter()
+
+loaded = [name for name in {heavy!r} if name in sys.modules]
+print(middle - start, end - middle, ",".join(loaded))
+"""
+
+
+def measure(prelude: str = "") -> tuple[float, float, list[str]]:
+    """Imports NumPy and then the engine in a fresh interpreter, returning how
+    long each took in seconds, and the heavy packages loaded. Anything in
+    `prelude` is imported just before the engine, and timed with it."""
+    script = SCRIPT.format(prelude=prelude, heavy=HEAVY)
+    output = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout.split()
+    loaded = output[2].split(",") if len(output) > 2 else []
+    return float(output[0]), float(output[1]), loaded
+
+
+def main():
+    parser = ArgumentParser(prog="python -m benchmarks.imports")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    # The first runs warm up the disk cache
+    measure()
+    measure(EAGER)
+    times: dict[str, list[float]] = {"numpy": [], "engine": [], "eager": []}
+    loaded: dict[str, list[str]] = {}
+    # Interleaved, so that both see the same load on the machine
+    for _ in range(args.runs):
+        numpy_time, engine_time, loaded["engine"] = measure()
+        times["numpy"].append(numpy_time)
+        times["engine"].append(engine_time)
+        _, eager_time, loaded["eager"] = measure(EAGER)
+        times["eager"].append(eager_time)
+
+    print(f"{'import':<8}{'median ms':>11}{'p95 ms':>8}  loaded")
+    for name, seconds in times.items():
+        milliseconds = np.array(seconds) * 1000
+        heavy = ", ".join(loaded.get(name, [])) or "-"
+        print(
+            f"{name:<8}{np.median(milliseconds):>11.1f}"
+            f"{np.percentile(milliseconds, 95):>8.1f}  {heavy}"
+        )
+
+
+if __name__ == "__main__":
+    main()
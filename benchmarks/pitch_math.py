@@ -0,0 +1,60 @@
+"""Compares converting a session's worth of readings to pitches one at a time,
+against converting them all in one call with the array versions of the `note`
+functions.
+
+A reading is made about every 12ms, so an hour long session is around 300,000
+readings. Each is converted to its nearest offset, octave, note and cents
+deviation.
+"""
+
+from time import perf_counter
+
+import numpy as np
+
+from engine.note import (
+    cents_deviation,
+    frequency_to_offset,
+    offset_to_note_index,
+    offset_to_octave,
+)
+
+
+READINGS = (1_000, 10_000, 300_000)
+
+
+def convert(frequencies):
+    offsets = frequency_to_offset(frequencies)
+    return (
+        offsets,
+        offset_to_octave(offsets),
+        offset_to_note_index(offsets),
+        cents_deviation(frequencies),
+    )
+
+
+def main():
+    rng = np.random.default_rng(0)
+
+    print(f"{'readings':>10}{'scalar ms':>12}{'array ms':>11}{'speedup':>10}")
+    for count in READINGS:
+        # Anywhere across the range of a guitar
+        frequencies = rng.uniform(80.0, 1200.0, count)
+        scalars = frequencies.tolist()
+
+        start = perf_counter()
+        for frequency in scalars:
+            convert(frequency)
+        scalar = perf_counter() - start
+
+        start = perf_counter()
+        convert(frequencies)
+        array = perf_counter() - start
+
+        print(
+            f"{count:>10}{scalar * 1000:>12.2f}{array * 1000:>11.2f}"
+            f"{scalar / array:>10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Measures recording a session and replaying it through the pitch tracker.
+
+A run of notes up every string of the guitar is recorded in each sample
+format. This reports the size of each recording, the time the capture thread
+spends handing each block to the recorder, and how many times faster than real
+time the recording replays through `SoundManager`.
+"""
+
+import os
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+import numpy as np
+
+from engine import FileSource, Instrument, SoundManager
+from engine.recording import Recorder, SampleFormat
+from engine.synth import corpus
+
+
+SAMPLE_RATE = 44100
+BLOCK_SIZE = 2**9
+
+
+def main():
+    session = np.concatenate(
+        [
+            rendering.samples
+            for rendering in corpus(Instrument.GUITAR, SAMPLE_RATE, duration=0.5)
+        ]
+    )
+    blocks = [
+        session[start : start + BLOCK_SIZE, np.newaxis]
+        for start in range(0, len(session), BLOCK_SIZE)
+    ]
+    duration = len(session) / SAMPLE_RATE
+
+    print(f"{'format':<10}{'size KiB':>10}{'us/block':>10}{'real-time x':>13}")
+    with TemporaryDirectory() as directory:
+        for sample_format in SampleFormat:
+            path = os.path.join(directory, f"{sample_format.name}.rec")
+
+            recorder = Recorder(path, SAMPLE_RATE, sample_format=sample_format)
+            start = perf_counter()
+            for block in blocks:
+                # As from a source without a clock of its own
+                recorder.write(block, None, 0.0, perf_counter())
+            handover = perf_counter() - start
+            recorder.close()
+
+            sound_manager = SoundManager()
+            start = perf_counter()
+            sound_manager.listen(FileSource(path))
+            replay = perf_counter() - start
+
+            print(
+                f"{sample_format.name:<10}"
+                f"{os.path.getsize(path) / 1024:>10.0f}"
+                f"{handover / len(blocks) * 1e6:>10.2f}"
+                f"{duration / replay:>13.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
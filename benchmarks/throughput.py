@@ -0,0 +1,97 @@
+"""Compares the throughput and allocations of the analysis run on every window
+and every block.
+
+The previous transform multiplied the float32 window straight into a float64
+padded buffer, which casts it through a scratch buffer first, and had NumPy's
+FFT allocate a complex spectrum on every call. The onset detector built its
+spectrum and flux out of temporary arrays. Now both stay in float32 and
+transform in place with SciPy, so only ever write into buffers they own, on
+any version of NumPy.
+"""
+
+import tracemalloc
+from timeit import timeit
+
+import numpy as np
+
+from engine.onset import OnsetDetector
+from engine.pitch_detector import HarmonicProductSpectrum
+
+
+SAMPLE_RATE = 44100
+BLOCK_LENGTH = 512
+REPEATS = 200
+
+
+class PreviousTransform:
+    """The transform before it was kept in float32 and done in place."""
+
+    def __init__(self, window_length: int, padded_length: int):
+        self.window = np.hamming(window_length)
+        self.padded = np.zeros(padded_length)
+
+    def __call__(self, window: np.ndarray) -> np.ndarray:
+        np.multiply(self.window, window, out=self.padded[: len(self.window)])
+        return np.abs(np.fft.rfft(self.padded))
+
+
+def previous_onset(detector: OnsetDetector, block: np.ndarray):
+    """The onset detector's spectral flux, before it kept its own buffers."""
+    detector._frame.write(block)
+    windowed = detector._frame.view() * detector._window
+    detector._previous, detector._magnitude = detector._magnitude, detector._previous
+    np.log1p(np.abs(np.fft.rfft(windowed)), out=detector._magnitude)
+
+    np.copyto(detector._reference, detector._previous)
+    np.maximum(
+        detector._reference[1:], detector._previous[:-1], out=detector._reference[1:]
+    )
+    np.maximum(
+        detector._reference[:-1], detector._previous[1:], out=detector._reference[:-1]
+    )
+    detector.flux = float(
+        np.sum(np.maximum(detector._magnitude - detector._reference, 0.0))
+    )
+
+
+def measure(call) -> tuple[float, int]:
+    """Returns the calls per second and the peak bytes allocated by a call."""
+    # Warm up any of NumPy's caches first
+    call()
+
+    tracemalloc.start()
+    try:
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    seconds = timeit(call, number=REPEATS)
+    return REPEATS / seconds, peak - current
+
+
+def main():
+    rng = np.random.default_rng(0)
+    plan = HarmonicProductSpectrum(SAMPLE_RATE).plan
+    previous_transform = PreviousTransform(plan.window_length, plan.padded_length)
+    window = rng.uniform(-1.0, 1.0, plan.window_length).astype(np.float32)
+    detector = OnsetDetector(SAMPLE_RATE)
+    block = rng.uniform(-1.0, 1.0, BLOCK_LENGTH).astype(np.float32)
+    for _ in range(detector.frame_length // BLOCK_LENGTH):
+        detector.process(block)
+
+    print(f"{'path':<24}{'calls/s':>12}{'bytes/call':>12}")
+    for name, call in (
+        ("transform (previous)", lambda: previous_transform(window)),
+        ("transform", lambda: plan.transform(window)),
+        ("onset (previous)", lambda: previous_onset(detector, block)),
+        ("onset", lambda: detector.process(block)),
+    ):
+        rate, allocated = measure(call)
+        print(f"{name:<24}{rate:>12.0f}{allocated:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Compares the cost of building the magnitude spectrum of a window.
+
+The original path rebuilt the Hamming window, padded the signal and ran a full
+complex FFT on every call, the `AnalysisPlan` reuses all of its buffers and
+only transforms the positive half of the spectrum.
+"""
+
+from timeit import timeit
+
+import numpy as np
+
+from engine.analysis import AnalysisPlan
+
+
+SAMPLE_RATE = 44100
+WINDOW_SIZE = 0.6
+PADDED_SIZE = 0.9
+HARMONICS = 4
+REPEATS = 200
+
+
+def original_transform(window: np.ndarray) -> np.ndarray:
+    """The original transform from `SoundManager._read_frequency`."""
+    signal = np.hamming(len(window)) * window
+    signal = np.pad(
+        signal,
+        [(0, int(PADDED_SIZE * SAMPLE_RATE) - len(signal))],
+        mode="constant",
+    )
+    signal = np.fft.fft(signal)
+    return np.abs(signal)
+
+
+def main():
+    plan = AnalysisPlan(SAMPLE_RATE, WINDOW_SIZE, PADDED_SIZE, HARMONICS)
+    rng = np.random.default_rng(0)
+    window = rng.uniform(-1.0, 1.0, plan.window_length).astype(np.float32)
+
+    print(f"{'transform':<16}{'ms/window':>16}")
+    for name, transform in (
+        ("original", original_transform),
+        ("plan", plan.transform),
+    ):
+        seconds = timeit(lambda: transform(window), number=REPEATS)
+        print(f"{name:<16}{seconds / REPEATS * 1000:>16.3f}")
+
+
+if __name__ == "__main__":
+    main()
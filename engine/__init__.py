@@ -1,8 +1,11 @@
 """The engine is responsible for determining the user's pitch, alongside
 building lessons and exercises.
 
-The `SoundManager` is where all the pitch tracking code resides, with the
-`note` module containing most of the scientific pitch notation logic/maths.
+The `SoundManager` is where all the pitch tracking code resides, listening to
+an `AudioSource` and handing each window of audio to one of the `Detector`
+algorithms, with the `note` module containing most of the scientific pitch
+notation logic/maths. Its events can be handled like pyglet's, without the
+engine needing pyglet, or iterated from asyncio code as an `EventStream`.
 
 User data is managed entirely by the `StorageManager`, which attempts to
 provide a seamless interface with the filesystem, meaning data in RAM and the
@@ -17,7 +20,16 @@ adding new knowledge goals.
 """
 
 from .sound_manager import SoundManager
+from .pitch_detector import Detector, PitchDetector
 from .storage_manager import StorageManager
+from .sources import (
+    AudioSource,
+    PyAudioSource,
+    FileSource,
+    PipeSource,
+    SyntheticSource,
+)
+from .stream import EventKind, EventStream, Overflow, PitchEvent
 
 from .note import (
     Pitch,
@@ -28,6 +40,8 @@ from .note import (
     frequency_to_offset_unrounded,
     offset_to_octave,
     offset_to_frequency,
+    offset_to_note_index,
+    cents_deviation,
 )
 
 from .clef import Clef
@@ -39,7 +53,18 @@ from .exercise import Exercise
 
 __all__ = [
     "SoundManager",
+    "Detector",
+    "PitchDetector",
     "StorageManager",
+    "AudioSource",
+    "PyAudioSource",
+    "FileSource",
+    "PipeSource",
+    "SyntheticSource",
+    "EventKind",
+    "EventStream",
+    "Overflow",
+    "PitchEvent",
     "Pitch",
     "Note",
     "Name",
@@ -48,6 +73,8 @@ __all__ = [
     "frequency_to_offset_unrounded",
     "offset_to_octave",
     "offset_to_frequency",
+    "offset_to_note_index",
+    "cents_deviation",
     "Clef",
     "Instrument",
     "Progress",
@@ -0,0 +1,256 @@
+"""Precomputed state for the pitch tracker's spectral analysis."""
+
+import numpy as np
+
+
+def fast_length(length: int) -> int:
+    """Returns the smallest length of at least `length` with no prime factors
+    above 5, which the FFT handles far faster than a length with a large prime
+    factor."""
+    best = 1 << max(length - 1, 0).bit_length()
+    fives = 1
+    while fives < best:
+        threes = fives
+        while threes < best:
+            # Smallest power of two taking this product up to the length
+            product = threes << max((length - 1) // threes, 0).bit_length()
+            best = min(best, product)
+            threes *= 3
+        fives *= 5
+    return best
+
+
+class MagnitudeSpectrum:
+    """Works out the magnitude spectrum of real signals of a fixed length,
+    without allocating anything.
+
+    NumPy's real FFT can only write into a buffer it is given from NumPy 2.0
+    onwards, so SciPy's FFTPACK interface is used instead, which transforms the
+    signal in place. That leaves the positive half of the spectrum packed into
+    the signal's own buffer as `[r0, r1, i1, r2, i2, ...]`, ending on a purely
+    real bin if the length is even, and the magnitudes are worked out from
+    there. Unlike NumPy's, the transform runs in float32 without converting
+    through a copy first.
+
+    Given a batch shape, the signals may hold a row per channel, and up to that
+    many rows are transformed at once.
+    """
+
+    def __init__(self, length: int, batch: tuple[int, ...] = ()):
+        # SciPy takes a noticeable time to import, so it is only imported once
+        # something needs transforming
+        from scipy import fftpack
+
+        self._rfft = fftpack.rfft
+        self.length = length
+        # Bins with both a real and an imaginary part, between the first bin
+        # and the last
+        self._pairs = (length - 1) // 2
+        # Squared imaginary parts
+        self._squares = np.zeros((*batch, self._pairs), dtype=np.float32)
+
+    def __call__(self, signal: np.ndarray, magnitude: np.ndarray):
+        """Writes the magnitude of each bin of the signal's spectrum into
+        `magnitude`, overwriting the signal along the way."""
+        spectrum = self._rfft(signal, axis=-1, overwrite_x=True)
+
+        # The first bin is purely real
+        np.abs(spectrum[..., 0], out=magnitude[..., 0])
+
+        end = 2 * self._pairs + 1
+        pairs = magnitude[..., 1 : self._pairs + 1]
+        squares = self._squares[: len(signal)] if signal.ndim > 1 else self._squares
+        np.square(spectrum[..., 1:end:2], out=pairs)
+        np.square(spectrum[..., 2:end:2], out=squares)
+        np.add(pairs, squares, out=pairs)
+        np.sqrt(pairs, out=pairs)
+
+        # As is the last, for an even length
+        if self.length % 2 == 0:
+            np.abs(spectrum[..., -1], out=magnitude[..., -1])
+
+
+class AnalysisPlan:
+    """Everything the analysis of a window needs that can be worked out ahead
+    of time: the window function, the zero-padded work buffer, and the output
+    buffers for the real FFT.
+
+    A plan only depends on its `key`, so it can be reused for as long as the
+    sample rate and analysis settings stay the same.
+
+    Windows arrive as float32, and every buffer is float32 too, so the whole
+    analysis runs without converting or allocating anything along the way.
+
+    Given a number of `channels`, every buffer gains a leading channel axis,
+    and a window of each channel is transformed at once as a single batch. A
+    batch may hold fewer windows than there are channels, in which case only
+    as many rows of each buffer are used.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        window_size: float,
+        padded_size: float | None,
+        harmonics: int,
+        channels: int | None = None,
+        band: tuple[float, float] | None = None,
+    ):
+        self.key = (sample_rate, window_size, padded_size, harmonics, channels, band)
+        self.sample_rate = sample_rate
+        self.harmonics = harmonics
+        self.channels = channels
+        # Leading shape of every buffer
+        batch = (channels,) if channels is not None else ()
+
+        # Lengths of the window and the padded signal, in frames
+        self.window_length = int(sample_rate * window_size)
+        if padded_size is not None:
+            self.padded_length = fast_length(
+                max(int(sample_rate * padded_size), self.window_length)
+            )
+        else:
+            self.padded_length = self.window_length
+
+        # Hamming Window
+        self.window = np.hamming(self.window_length).astype(np.float32)
+
+        # Zero Padding. The transform overwrites the whole buffer, so the
+        # padding is zeroed again before each window is copied in.
+        self.padded = np.zeros((*batch, self.padded_length), dtype=np.float32)
+        self._head = self.padded[..., : self.window_length]
+        self._tail = self.padded[..., self.window_length :]
+
+        # The input is real, so only the positive half of the spectrum is kept
+        bins = self.padded_length // 2 + 1
+        self._transform = MagnitudeSpectrum(self.padded_length, batch)
+        self.magnitude = np.zeros((*batch, bins), dtype=np.float32)
+
+        # Frequency covered by each bin of the spectrum
+        self.bin_size = sample_rate / self.padded_length
+
+        # Every harmonic spectrum is cropped to the length of the most
+        # downsampled one, and to the band of fundamentals that can actually
+        # be played, if there is one
+        self.low_bin = 0
+        self.high_bin = bins // harmonics
+        if band is not None:
+            low, high = band
+            self.low_bin = min(int(low / self.bin_size), self.high_bin)
+            self.high_bin = min(int(np.ceil(high / self.bin_size)) + 1, self.high_bin)
+        self.hps = np.zeros((*batch, self.high_bin - self.low_bin), dtype=np.float32)
+
+    def _rows(self, batch: np.ndarray) -> slice:
+        """The rows of each buffer used by a batch."""
+        return slice(len(batch)) if self.channels is not None else slice(None)
+
+    def transform(self, window: np.ndarray) -> np.ndarray:
+        """Returns the magnitude spectrum of a window, or of a batch of windows
+        with a row per channel.
+
+        The returned array is owned by the plan, and is overwritten by the next
+        call.
+        """
+        rows = self._rows(window)
+
+        # The window is copied in and windowed in place
+        self._tail[rows] = 0.0
+        head = self._head[rows]
+        np.copyto(head, window)
+        np.multiply(head, self.window, out=head)
+
+        # Take Magnitude of Fourier Transform
+        self._transform(self.padded[rows], self.magnitude[rows])
+
+        return self.magnitude[rows]
+
+    def harmonic_product(self, magnitude: np.ndarray) -> np.ndarray:
+        """Returns the harmonic product spectrum of a magnitude spectrum.
+
+        Downsampling the spectrum by `n` is just taking every `n`th bin, so
+        each harmonic spectrum is a strided view and the product is built up in
+        place. Only the bins from `low_bin` up to `high_bin` are worked out, so
+        index `i` of the product is bin `low_bin + i` of the spectrum.
+
+        The returned array is owned by the plan, and is overwritten by the next
+        call.
+        """
+        hps = self.hps[self._rows(magnitude)]
+        low, high = self.low_bin, self.high_bin
+        np.copyto(hps, magnitude[..., low:high])
+        for n in range(2, self.harmonics + 1):
+            np.multiply(hps, magnitude[..., low * n : high * n : n], out=hps)
+
+        return hps
+
+
+class TestMagnitudeSpectrum:
+    def test_matches_numpy(self):
+        rng = np.random.default_rng(0)
+        # Both an even and an odd length, with and without a last real bin
+        for length in (16, 15):
+            signals = rng.uniform(-1.0, 1.0, (3, length)).astype(np.float32)
+            expected = np.abs(np.fft.rfft(signals, axis=-1))
+
+            transform = MagnitudeSpectrum(length, (3,))
+            magnitude = np.zeros((3, length // 2 + 1), dtype=np.float32)
+            transform(signals[:2].copy(), magnitude[:2])
+            assert np.allclose(magnitude[:2], expected[:2], atol=1e-5)
+
+            single = MagnitudeSpectrum(length)
+            single(signals[2].copy(), magnitude[2])
+            assert np.allclose(magnitude[2], expected[2], atol=1e-5)
+
+
+class TestAnalysisPlan:
+    def test_harmonic_product(self):
+        plan = AnalysisPlan(8, 1.0, None, 2)
+        magnitude = np.arange(5, dtype=np.float64)
+        assert list(plan.harmonic_product(magnitude)) == [0 * 0, 1 * 2]
+
+    def test_peak(self):
+        plan = AnalysisPlan(8000, 0.5, 1.0, 4)
+        time = np.arange(plan.window_length) / plan.sample_rate
+        # Harmonics of 100Hz, with a weak fundamental
+        window = sum(
+            amplitude * np.sin(2 * np.pi * 100.0 * n * time)
+            for n, amplitude in ((1, 0.2), (2, 1.0), (3, 0.8), (4, 0.5))
+        )
+        hps = plan.harmonic_product(plan.transform(window))
+        assert np.argmax(hps) * plan.bin_size == 100.0
+
+    def test_channels(self):
+        plan = AnalysisPlan(8000, 0.5, 1.0, 4, channels=2)
+        time = np.arange(plan.window_length) / plan.sample_rate
+        # A harmonic tone on each channel
+        windows = np.stack(
+            [
+                sum(np.sin(2 * np.pi * frequency * n * time) / n for n in range(1, 5))
+                for frequency in (100.0, 250.0)
+            ]
+        )
+        hps = plan.harmonic_product(plan.transform(windows))
+        assert list(np.argmax(hps, axis=-1) * plan.bin_size) == [100.0, 250.0]
+
+        # A smaller batch only uses the first rows
+        hps = plan.harmonic_product(plan.transform(windows[1:]))
+        assert list(np.argmax(hps, axis=-1) * plan.bin_size) == [250.0]
+
+    def test_band(self):
+        full = AnalysisPlan(8000, 0.5, 1.0, 4)
+        band = AnalysisPlan(8000, 0.5, 1.0, 4, band=(80.0, 300.0))
+        assert band.low_bin * band.bin_size <= 80.0
+        assert (band.high_bin - 1) * band.bin_size >= 300.0
+
+        # The band is just a slice of the full product
+        magnitude = np.random.default_rng(0).uniform(size=full.magnitude.shape)
+        expected = full.harmonic_product(magnitude)[band.low_bin : band.high_bin]
+        assert np.array_equal(band.harmonic_product(magnitude), expected)
+
+    def test_fast_length(self):
+        assert fast_length(1) == 1
+        assert fast_length(7) == 8
+        assert fast_length(11) == 12
+        assert fast_length(8000) == 8000
+        # 39690 = 2 * 3^4 * 5 * 7^2
+        assert fast_length(39690) == 40000
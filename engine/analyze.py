@@ -0,0 +1,182 @@
+"""Runs the pitch tracker over a recording, without an audio device.
+
+Usage: `python -m engine.analyze take.wav`, or pipe raw float32 samples in with
+`python -m engine.analyze -`, or try it out on a few synthetic notes with
+`python -m engine.analyze --tone 82.41 --tone 110`.
+
+The audio is streamed through `SoundManager.listen` in the same sized chunks an
+audio device would deliver, so the buffering, frequency detection and offset
+debouncing are exactly the same as when listening live. Every reading is
+printed with its timestamp and how far it is from the nearest semitone, and
+onsets and offsets broadcast to the rest of the application are marked.
+
+A session recorded by `SoundManager.record` is replayed block for block, exactly
+as it was captured.
+"""
+
+import sys
+from argparse import ArgumentParser
+
+import numpy as np
+
+from .note import Note, Pitch, cents_deviation, frequency_to_offset
+from .pitch_detector import Detector
+from .sound_manager import SoundManager
+from .sources import BLOCK_SIZE, AudioSource, FileSource, PipeSource, SyntheticSource
+
+
+def analyze(
+    source: str | AudioSource,
+    detector: Detector = Detector.HPS,
+    hop: float | None = None,
+    block_size: int = BLOCK_SIZE,
+    latency: str | None = None,
+):
+    """Prints the pitch track of a source, or of a wave file or recording by
+    its path, optionally dumping the latency of each stage to a JSON file.
+
+    Only the first channel is printed.
+    """
+    sound_manager = SoundManager()
+    sound_manager.detector = detector
+    sound_manager.hop = hop
+
+    if isinstance(source, str):
+        source = FileSource(source, block_size)
+
+    last_frequency: float | None = None
+
+    # Every change of reading, onset and broadcast, in order, timed from the
+    # end of the block it came from. Readings are only converted to pitches
+    # once the whole source has been analysed, in one go.
+    events: list[tuple[float, str, float | None]] = []
+    # Time, frequency and confidence of every reading that wasn't silent
+    readings: list[tuple[float, float, float]] = []
+
+    def on_frequency_change(frequency: float | None):
+        nonlocal last_frequency
+        # Only keep changes of reading, to keep the track readable
+        if frequency == last_frequency:
+            return
+        last_frequency = frequency
+
+        time = sound_manager.time
+        if frequency is None:
+            events.append((time, "silence", None))
+            return
+
+        events.append((time, "reading", len(readings)))
+        readings.append((time, frequency, sound_manager.confidence))
+
+    def on_new_offset(offset: int | None):
+        events.append((sound_manager.time, "broadcast", offset))
+
+    def on_onset(onset_time: float):
+        # The onset is timed from the start of its block
+        events.append((onset_time, "onset", None))
+
+    sound_manager.push_handlers(
+        on_frequency_change=on_frequency_change,
+        on_new_offset=on_new_offset,
+        on_onset=on_onset,
+    )
+    sound_manager.listen(source)
+
+    # Convert every reading at once, rather than one at a time
+    track = np.array(readings).reshape(-1, 3)
+    frequencies = track[:, 1]
+    offsets = frequency_to_offset(frequencies).tolist()
+    cents = cents_deviation(frequencies)
+
+    for time, event, value in events:
+        match event:
+            case "silence":
+                print(f"{time:9.3f}s  -")
+            case "reading":
+                _, frequency, confidence = readings[value]
+                offset = offsets[value]
+                pitch = Pitch.from_offset(offset, Note.Mode.SHARPS)
+                print(
+                    f"{time:9.3f}s  {frequency:9.2f}Hz  {str(pitch):<4} "
+                    f"{offset:4d} {cents[value]:+4.0f}c  ({confidence:.2f})"
+                )
+            case "broadcast":
+                print(f"{time:9.3f}s  broadcast offset {value}")
+            case "onset":
+                print(f"{time:9.3f}s  onset")
+
+    if latency is not None:
+        sound_manager.latency.dump(latency)
+
+
+def main():
+    parser = ArgumentParser(
+        prog="python -m engine.analyze",
+        description="Prints the pitch track of a wave file or recording.",
+    )
+    parser.add_argument(
+        "path",
+        nargs="?",
+        help="PCM wave file or recording to analyse, or - to read raw float32 "
+        "samples from stdin",
+    )
+    parser.add_argument(
+        "--tone",
+        type=float,
+        action="append",
+        metavar="HZ",
+        help="analyse a synthetic note at this frequency instead of a file, "
+        "repeat for a run of notes",
+    )
+    parser.add_argument(
+        "--sample-rate",
+        type=int,
+        default=44100,
+        help="sample rate of stdin or the synthetic notes",
+    )
+    parser.add_argument(
+        "--channels", type=int, default=1, help="channels interleaved on stdin"
+    )
+    parser.add_argument(
+        "--detector",
+        choices=list(Detector.__members__.keys()),
+        default=Detector.HPS.name,
+    )
+    parser.add_argument(
+        "--hop",
+        type=float,
+        default=None,
+        help="minimum time between analyses in milliseconds",
+    )
+    parser.add_argument("--block-size", type=int, default=BLOCK_SIZE)
+    parser.add_argument(
+        "--latency",
+        metavar="PATH",
+        help="dump the latency of each stage to a JSON file",
+    )
+    args = parser.parse_args()
+
+    if args.tone is not None:
+        source: str | AudioSource = SyntheticSource(
+            args.tone, args.sample_rate, block_size=args.block_size
+        )
+    elif args.path == "-":
+        source = PipeSource(
+            sys.stdin.buffer, args.sample_rate, args.channels, args.block_size
+        )
+    elif args.path is not None:
+        source = args.path
+    else:
+        parser.error("a path or --tone is needed")
+
+    analyze(
+        source,
+        Detector[args.detector],
+        args.hop / 1000 if args.hop is not None else None,
+        args.block_size,
+        args.latency,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Settles the pitch tracker's readings into offsets, so that the rest of the
+application only hears about notes that are actually being played."""
+
+from .note import frequency_to_offset_unrounded
+
+
+class Debouncer:
+    """Only lets an offset through once its readings have held steady for a
+    length of time.
+
+    Time is measured on the stream's clock, rather than by counting readings,
+    so the delay doesn't depend on how often the audio is analysed or how many
+    readings are coalesced before reaching the main thread.
+
+    Readings are steady as long as they stay within a tolerance band of the
+    first reading of the offset, a slide or bend restarts the hold. To stop a
+    note played right between two semitones flickering from one to the other,
+    a reading only moves on from the current offset once it is far enough past
+    the boundary between them.
+    """
+
+    def __init__(
+        self,
+        hold: float = 0.05,
+        tolerance: float = 25.0,
+        hysteresis: float = 15.0,
+    ):
+        # How long readings must hold steady before their offset is broadcast,
+        # in seconds
+        self.hold = hold
+        # How far, in cents, readings may wander from the first reading of
+        # their offset while holding
+        self.tolerance = tolerance
+        # How far, in cents, a reading must be past the edge of the current
+        # offset's semitone to move on from it
+        self.hysteresis = hysteresis
+
+        # The offset being held, or None for silence
+        self.offset: int | None = None
+        # The last offset broadcast
+        self.broadcasted: int | None = None
+        # Stream time the hold started
+        self._since: float = 0.0
+        # Unrounded offset of the first reading of the hold
+        self._anchor: float | None = None
+
+    def update(self, frequency: float | None, time: float) -> bool:
+        """Adds a reading made at the given stream time, in seconds, returning
+        whether its offset should now be broadcast."""
+        if frequency is None:
+            unrounded = None
+            offset = None
+        else:
+            unrounded = frequency_to_offset_unrounded(frequency)
+            # Stay on the current offset until clearly past its semitone
+            if (
+                self.offset is not None
+                and abs(unrounded - self.offset) <= 0.5 + self.hysteresis / 100
+            ):
+                offset = self.offset
+            else:
+                offset = round(unrounded)
+
+        # A new offset, or a reading that has drifted, starts the hold again
+        if (
+            offset != self.offset
+            or unrounded is not None
+            and self._anchor is not None
+            and abs(unrounded - self._anchor) * 100 > self.tolerance
+        ):
+            self.offset = offset
+            self._since = time
+            self._anchor = unrounded
+
+        if self.offset != self.broadcasted and time - self._since >= self.hold:
+            self.broadcasted = self.offset
+            return True
+        return False
+
+
+class TestDebouncer:
+    @staticmethod
+    def frequency(offset: float) -> float:
+        return 440 * 2 ** (offset / 12)
+
+    def test_hold(self):
+        debouncer = Debouncer(hold=0.05)
+        assert not debouncer.update(self.frequency(0), 0.0)
+        assert not debouncer.update(self.frequency(0), 0.04)
+        assert debouncer.update(self.frequency(0), 0.05)
+        assert debouncer.broadcasted == 0
+        # Only broadcast once
+        assert not debouncer.update(self.frequency(0), 0.1)
+
+        # Silence is held too
+        assert not debouncer.update(None, 0.2)
+        assert debouncer.update(None, 0.3)
+        assert debouncer.broadcasted is None
+
+    def test_hysteresis(self):
+        debouncer = Debouncer(hold=0.0, hysteresis=15.0)
+        assert debouncer.update(self.frequency(0.4), 0.0)
+        # Just past the boundary, still within the hysteresis
+        assert not debouncer.update(self.frequency(0.6), 0.1)
+        assert debouncer.offset == 0
+        # Clearly into the next semitone
+        assert debouncer.update(self.frequency(0.7), 0.2)
+        assert debouncer.broadcasted == 1
+
+    def test_tolerance(self):
+        debouncer = Debouncer(hold=0.05, tolerance=20.0)
+        debouncer.update(self.frequency(-0.3), 0.0)
+        # A slide within the same semitone restarts the hold
+        assert not debouncer.update(self.frequency(0.0), 0.04)
+        assert not debouncer.update(self.frequency(0.0), 0.06)
+        assert debouncer.update(self.frequency(0.0), 0.1)
@@ -0,0 +1,140 @@
+"""Brings captured audio down to a lower sample rate before it is analysed.
+
+Guitar and bass fundamentals, and the few harmonics above them the pitch
+detectors make use of, sit far below the Nyquist frequency of a 44.1kHz or
+48kHz stream. Analysing at a lower rate holds the same length of audio, at the
+same frequency resolution, in far fewer samples.
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def lowpass(factor: int, passband: float = 0.8, attenuation: float = 80.0):
+    """Designs the anti-aliasing filter for decimating by `factor`, as a
+    Kaiser windowed sinc.
+
+    Everything up to `passband` of the decimated Nyquist frequency is kept, and
+    everything above the decimated Nyquist frequency is attenuated by at least
+    `attenuation` decibels. Anything in between may alias, but only onto the
+    frequencies above the passband.
+    """
+    # Edges of the transition band, in cycles per input sample
+    nyquist = 0.5 / factor
+    width = (1.0 - passband) * nyquist
+    cutoff = nyquist - width / 2
+
+    # Kaiser's estimates for the length and shape of the window
+    order = int(np.ceil((attenuation - 8.0) / (2.285 * 2 * np.pi * width)))
+    beta = 0.1102 * (attenuation - 8.7)
+
+    n = np.arange(order + 1) - order / 2
+    taps = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(order + 1, beta)
+    # Unity gain at DC
+    return taps / taps.sum()
+
+
+class Decimator:
+    """Low-pass filters and downsamples blocks of audio as they stream in.
+
+    The filter runs across the boundaries between blocks, keeping the end of
+    each block for the outputs of the next, so a stream decimates exactly the
+    same however it is split into blocks.
+
+    Only every `factor`th output of the filter is ever worked out, the others
+    would just be thrown away. Each one is the dot product of the filter with
+    the input leading up to it, which is the same work as a polyphase filter
+    bank, done as a single product over every channel.
+    """
+
+    def __init__(self, factor: int, channels: int = 1, passband: float = 0.8):
+        self.factor = factor
+        self.channels = channels
+        # Reversed, so that each output is a plain dot product with the input
+        # in order
+        self.taps = lowpass(factor, passband)[::-1].astype(np.float32)
+
+        # The end of the last block, followed by the block being decimated.
+        # Grown to fit the largest block seen so far.
+        self._history = len(self.taps) - 1
+        self._input = np.zeros((channels, self._history), dtype=np.float32)
+        # Index into the next block of the first input sample with an output
+        self._phase = 0
+
+    @property
+    def delay(self) -> float:
+        """How far the filter delays its input, in input samples."""
+        return self._history / 2
+
+    def reset(self):
+        """Forgets every block so far, as if the stream had just started."""
+        self._input[:, : self._history] = 0.0
+        self._phase = 0
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """Decimates a block of samples with a column per channel, returning a
+        row of decimated samples per channel.
+
+        A block needn't be a multiple of the factor long, any remainder is
+        carried over into the next.
+        """
+        frames = len(block)
+        history = self._history
+
+        if history + frames > self._input.shape[1]:
+            grown = np.zeros((self.channels, history + frames), dtype=np.float32)
+            grown[:, :history] = self._input[:, :history]
+            self._input = grown
+        signal = self._input[:, : history + frames]
+        signal[:, history:] = block.T
+
+        # The stretch of input leading up to each output. The stretches are
+        # strided views that overlap, which `einsum` reads straight through
+        # where a matrix product would copy them out first.
+        windows = sliding_window_view(signal, len(self.taps), axis=-1)
+        output = np.einsum(
+            "cok,k->co", windows[:, self._phase :: self.factor], self.taps
+        )
+
+        # Keep the end of the input for the next block, NumPy copies through a
+        # temporary if the two overlap
+        signal[:, :history] = signal[:, frames:]
+        self._phase = (self._phase - frames) % self.factor
+        return output
+
+
+class TestDecimator:
+    def test_streaming(self):
+        rng = np.random.default_rng(0)
+        signal = rng.uniform(-1.0, 1.0, (3000, 2)).astype(np.float32)
+
+        whole = Decimator(3, channels=2).process(signal)
+        assert whole.shape == (2, 1000)
+
+        # Blocks of any size, even shorter than the filter, give the same
+        # stream
+        decimator = Decimator(3, channels=2)
+        blocks = []
+        start = 0
+        for size in (512, 7, 100, 1, 1024, 1356):
+            blocks.append(decimator.process(signal[start : start + size]))
+            start += size
+        assert np.allclose(np.concatenate(blocks, axis=1), whole, atol=1e-5)
+
+    def test_response(self):
+        sample_rate = 44100
+        decimator = Decimator(3)
+        time = np.arange(sample_rate) / sample_rate
+
+        def gain(frequency: float) -> float:
+            decimator.reset()
+            tone = np.sin(2 * np.pi * frequency * time).astype(np.float32)
+            output = decimator.process(tone[:, np.newaxis])[0]
+            # Past the filter's start up
+            return np.max(np.abs(output[len(decimator.taps) :]))
+
+        # Kept within the passband
+        assert abs(gain(1000.0) - 1.0) < 1e-3
+        assert abs(gain(5500.0) - 1.0) < 1e-3
+        # Removed above the decimated Nyquist frequency
+        assert gain(9000.0) < 1e-3
@@ -0,0 +1,154 @@
+"""Keeps track of the audio input devices available to the `SoundManager`."""
+
+from dataclasses import dataclass
+from threading import Event, Lock, Thread
+from typing import Callable
+
+
+@dataclass(frozen=True)
+class Device:
+    """An audio input device, as it was last probed."""
+
+    name: str
+    # PortAudio's index for the device, which can change whenever PortAudio
+    # looks for devices again
+    index: int
+    sample_rate: int
+    # The most channels the device can capture at once
+    channels: int
+
+
+class DeviceRegistry:
+    """Caches the available input devices, so that they can always be read
+    instantly.
+
+    Probing every device can take a noticeable time on ALSA and JACK, so the
+    devices are only probed when a refresh is requested, or every `interval`
+    seconds once started. Either way, the probing happens on a background
+    thread, and the cache is swapped out once it is done.
+    """
+
+    def __init__(self, probe: Callable[[], list[Device]]):
+        # Returns every available input device, however long that takes
+        self._probe = probe
+
+        # Guards the cache, which is written by the refresh thread
+        self._lock = Lock()
+        self._devices: dict[str, Device] = {}
+        # Set once the devices have been probed at least once
+        self.probed = Event()
+
+        # Seconds between each refresh, or None to only refresh on request
+        self.interval: float | None = None
+        self._thread: Thread | None = None
+        # Set to wake the refresh thread
+        self._wake = Event()
+        self._running = False
+
+    @property
+    def devices(self) -> list[Device]:
+        """Every cached device."""
+        with self._lock:
+            return list(self._devices.values())
+
+    def names(self) -> list[str]:
+        """The name of every cached device."""
+        with self._lock:
+            return list(self._devices.keys())
+
+    def get(self, name: str) -> Device | None:
+        """Returns the cached device with a name, if there is one."""
+        with self._lock:
+            return self._devices.get(name)
+
+    def refresh(self, wait: bool = False):
+        """Probes the devices again on the background thread, or on this
+        thread and before returning if told to `wait`."""
+        if wait:
+            self._refresh()
+            return
+
+        self._start_thread()
+        self._wake.set()
+
+    def start(self, interval: float):
+        """Refreshes the devices every `interval` seconds, starting now."""
+        self.interval = interval
+        self.refresh()
+
+    def stop(self):
+        """Stops refreshing the devices, waiting for any refresh in progress to
+        finish."""
+        if self._thread is None:
+            return
+
+        self._running = False
+        self._wake.set()
+        self._thread.join()
+        self._thread = None
+        self._wake.clear()
+
+    def _start_thread(self):
+        """Starts the refresh thread, if it isn't already running."""
+        if self._thread is not None:
+            return
+
+        self._running = True
+        self._thread = Thread(
+            target=self._run,
+            name="DeviceRegistry refresh",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _run(self):
+        """The refresh thread's main loop."""
+        while True:
+            # Wakes early on request, or never times out without an interval
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if not self._running:
+                return
+
+            try:
+                self._refresh()
+            except OSError as error:
+                # Keep the old devices, and try again next time
+                print(f"Failed to probe audio devices: {error}")
+
+    def _refresh(self):
+        """Probes the devices and replaces the cache with them."""
+        devices: dict[str, Device] = {}
+        for device in self._probe():
+            # Devices are looked up by name, so only the first of any
+            # duplicates can be picked
+            devices.setdefault(device.name, device)
+
+        with self._lock:
+            self._devices = devices
+        self.probed.set()
+
+
+class TestDeviceRegistry:
+    def test_refresh(self):
+        plugged = [Device("Built-in", 0, 44100, 2)]
+        probed = Event()
+
+        def probe() -> list[Device]:
+            probed.set()
+            return list(plugged)
+
+        registry = DeviceRegistry(probe)
+        assert registry.names() == []
+
+        registry.refresh(wait=True)
+        assert registry.names() == ["Built-in"]
+        assert registry.get("Built-in") == plugged[0]
+
+        # A device plugged in turns up after the next background refresh
+        plugged.append(Device("Interface", 1, 48000, 8))
+        probed.clear()
+        registry.start(0.01)
+        assert probed.wait(1.0)
+        registry.stop()
+        assert registry.names() == ["Built-in", "Interface"]
@@ -22,6 +22,14 @@ class InstrumentData:
     scales: list[Scale]
     # How much to transpose the instrument's stave by
     transposition: int = 0
+    # Number of frets on the neck
+    frets: int = 24
+
+    @property
+    def highest_pitch(self) -> Pitch:
+        """Highest pitch that can be played, at the top fret of the highest
+        string."""
+        return Pitch.from_offset(self.strings[-1].offset + self.frets, Note.Mode.SHARPS)
 
 
 class Instrument(Enum):
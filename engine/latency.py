@@ -0,0 +1,152 @@
+"""Measures the latency of the pitch tracker, from the audio being captured to
+an offset reaching the interface."""
+
+import json
+from dataclasses import dataclass
+from enum import Enum
+from threading import Lock
+
+import numpy as np
+
+
+class Stage(Enum):
+    """Each stage a reading passes through, each timed from the end of the
+    last."""
+
+    # The device capturing a block, to the callback receiving it
+    INPUT = "input"
+    # The callback, to the analysis thread picking the window up
+    QUEUE = "queue"
+    # Reading the frequency of the window
+    ANALYSIS = "analysis"
+    # The reading waiting for the main thread to dispatch it
+    DELIVERY = "delivery"
+    # The first reading of an offset being dispatched, to the offset being
+    # broadcast once it has settled
+    DEBOUNCE = "debounce"
+    # The capture of the first reading of an offset, to it being broadcast
+    TOTAL = "total"
+
+
+@dataclass
+class Timestamps:
+    """When a reading reached each point of the pitch tracker, in
+    `perf_counter` seconds."""
+
+    # When the newest block in the window was captured by the device
+    captured: float
+    # When the callback received that block
+    called: float
+    # When reading the window's frequency started and finished
+    started: float = 0.0
+    finished: float = 0.0
+    # When the main thread dispatched the reading
+    dispatched: float = 0.0
+
+
+class LatencyTracker:
+    """Keeps the recent durations of each stage, summarised as percentiles.
+
+    Durations are recorded from the analysis and main threads, so the history
+    is guarded by a lock.
+    """
+
+    percentiles: tuple[int, ...] = (50, 95, 99)
+    # Histogram bucket edges, in milliseconds
+    buckets: tuple[float, ...] = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+    def __init__(self, history: int = 1000):
+        # How many of the most recent durations of each stage are kept
+        self.history = history
+        self._lock = Lock()
+        self._durations = {stage: np.zeros(self.history) for stage in Stage}
+        # Durations recorded for each stage, including those since overwritten
+        self._counts = {stage: 0 for stage in Stage}
+
+    def clear(self):
+        """Forgets every duration recorded so far."""
+        with self._lock:
+            for stage in Stage:
+                self._counts[stage] = 0
+
+    def record(self, stage: Stage, seconds: float):
+        """Records a single duration of a stage."""
+        with self._lock:
+            count = self._counts[stage]
+            self._durations[stage][count % self.history] = seconds
+            self._counts[stage] = count + 1
+
+    def record_reading(self, timestamps: Timestamps):
+        """Records every stage of a reading, up to its dispatch."""
+        self.record(Stage.INPUT, timestamps.called - timestamps.captured)
+        self.record(Stage.QUEUE, timestamps.started - timestamps.called)
+        self.record(Stage.ANALYSIS, timestamps.finished - timestamps.started)
+        self.record(Stage.DELIVERY, timestamps.dispatched - timestamps.finished)
+
+    def durations(self, stage: Stage) -> np.ndarray:
+        """Returns a copy of the recent durations of a stage, in seconds."""
+        with self._lock:
+            count = min(self._counts[stage], self.history)
+            return self._durations[stage][:count].copy()
+
+    def summary(self) -> dict[str, dict]:
+        """Summarises each stage with its percentiles and a histogram, in
+        milliseconds."""
+        summary = {}
+        for stage in Stage:
+            durations = self.durations(stage) * 1000
+            counts, _ = np.histogram(durations, bins=[*self.buckets, np.inf])
+            summary[stage.value] = {
+                "count": len(durations),
+                **{
+                    f"p{percentile}": (
+                        float(np.percentile(durations, percentile))
+                        if len(durations) > 0
+                        else None
+                    )
+                    for percentile in self.percentiles
+                },
+                "histogram": {
+                    "edges": list(self.buckets),
+                    "counts": counts.tolist(),
+                },
+            }
+        return summary
+
+    def report(self) -> str:
+        """Formats the percentiles of each stage as a table."""
+        lines = [
+            f"{'stage':<10}{'count':>7}"
+            + "".join(f"{f'p{p} ms':>9}" for p in self.percentiles)
+        ]
+        for stage, stats in self.summary().items():
+            line = f"{stage:<10}{stats['count']:>7}"
+            for percentile in self.percentiles:
+                value = stats[f"p{percentile}"]
+                line += f"{value:>9.1f}" if value is not None else f"{'-':>9}"
+            lines.append(line)
+        return "\n".join(lines)
+
+    def dump(self, path: str):
+        """Writes the summary to a JSON file."""
+        with open(path, "w") as file:
+            json.dump(self.summary(), file, indent=4)
+
+
+class TestLatencyTracker:
+    def test_summary(self):
+        tracker = LatencyTracker()
+        for i in range(1, 101):
+            tracker.record(Stage.ANALYSIS, i / 1000)
+
+        summary = tracker.summary()
+        assert summary["analysis"]["count"] == 100
+        assert abs(summary["analysis"]["p50"] - 50.5) < 1e-6
+        assert summary["analysis"]["histogram"]["counts"][-1] == 0
+        assert summary["total"]["p99"] is None
+
+    def test_history(self):
+        tracker = LatencyTracker(history=4)
+        for i in range(10):
+            tracker.record(Stage.INPUT, i)
+        assert sorted(tracker.durations(Stage.INPUT)) == [6, 7, 8, 9]
@@ -0,0 +1,47 @@
+"""A thread-safe, single slot handover of the latest value between threads."""
+
+from threading import Lock
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class Mailbox(Generic[T]):
+    """Holds only the latest value posted to it.
+
+    One thread posts values as often as it likes, while another takes them at
+    its own pace. Anything posted between two takes is overwritten, but the
+    taker is told how many posts it missed.
+    """
+
+    def __init__(self, value: T):
+        self._lock = Lock()
+        self._value = value
+        # Posts since the last take
+        self._count = 0
+
+    def post(self, value: T):
+        """Replaces the value in the mailbox."""
+        with self._lock:
+            self._value = value
+            self._count += 1
+
+    def take(self) -> tuple[int, T]:
+        """Returns the number of posts since the last take, alongside the latest
+        value."""
+        with self._lock:
+            count = self._count
+            self._count = 0
+            return count, self._value
+
+
+class TestMailbox:
+    def test_mailbox(self):
+        mailbox = Mailbox[int | None](None)
+        assert mailbox.take() == (0, None)
+
+        mailbox.post(1)
+        mailbox.post(2)
+        assert mailbox.take() == (2, 2)
+        # The value is kept, but there is nothing new
+        assert mailbox.take() == (0, 2)
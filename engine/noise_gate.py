@@ -0,0 +1,85 @@
+"""Tells notes apart from background noise."""
+
+import numpy as np
+
+
+class NoiseGate:
+    """Decides whether the input is silent from a running RMS level.
+
+    The level is smoothed exponentially, block by block, so a single quiet
+    block can't close the gate. The gate opens above one threshold and only
+    closes once the level has stayed under a lower one for the hold time, so a
+    decaying note hovering around a threshold doesn't flicker in and out.
+    """
+
+    # RMS level the gate opens at
+    open_threshold: float = 0.1
+    # RMS level the gate closes under, after the hold time
+    close_threshold: float = 0.05
+    # Time constant of the level smoothing, in seconds
+    smoothing: float = 0.02
+    # How long the level must stay under the close threshold, in seconds
+    hold: float = 0.15
+
+    def __init__(self, sample_rate: int):
+        self.sample_rate = sample_rate
+        self.is_open = False
+
+        # Smoothed mean square of the input
+        self._mean_square = 0.0
+        # Frames the level has spent under the close threshold while open
+        self._quiet_frames = 0
+
+    @property
+    def level(self) -> float:
+        """The smoothed RMS level of the input."""
+        return float(np.sqrt(self._mean_square))
+
+    def process(self, block: np.ndarray) -> bool:
+        """Updates the level with a block of samples, returning whether the
+        gate is open."""
+        if len(block) == 0:
+            return self.is_open
+
+        # The smoothing factor depends on the block length, so the time
+        # constant is the same whatever size blocks arrive in
+        decay = np.exp(-len(block) / (self.sample_rate * self.smoothing))
+        mean_square = float(np.dot(block, block)) / len(block)
+        self._mean_square = decay * self._mean_square + (1 - decay) * mean_square
+
+        level = self.level
+        if not self.is_open:
+            if level >= self.open_threshold:
+                self.is_open = True
+                self._quiet_frames = 0
+        elif level < self.close_threshold:
+            self._quiet_frames += len(block)
+            if self._quiet_frames >= self.hold * self.sample_rate:
+                self.is_open = False
+        else:
+            self._quiet_frames = 0
+
+        return self.is_open
+
+
+class TestNoiseGate:
+    def test_hysteresis(self):
+        gate = NoiseGate(1000)
+        loud = np.full(10, 0.5, dtype=np.float32)
+        quiet = np.full(10, 0.07, dtype=np.float32)
+        silent = np.zeros(10, dtype=np.float32)
+
+        assert not gate.process(quiet)
+        for _ in range(10):
+            gate.process(loud)
+        assert gate.is_open
+
+        # Between the thresholds, the gate stays open indefinitely
+        for _ in range(100):
+            assert gate.process(quiet)
+
+        # Under the close threshold, it only closes after the hold time
+        assert gate.process(silent)
+        for _ in range(20):
+            gate.process(silent)
+        assert not gate.is_open
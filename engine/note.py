@@ -4,9 +4,10 @@ and pitch, respectively.
 Also provides some handy functions for processing pitches.
 """
 
+import math
 from enum import Enum, auto
-from dataclasses import dataclass
-from typing import Self
+from dataclasses import dataclass, field
+from typing import ClassVar, Self
 
 import numpy as np
 
@@ -58,16 +59,23 @@ class Accidental(Enum):
                 return "𝄪"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True, eq=False)
 class Note:
     """A note is defined as a combination of a note name and an accidental.
 
     E.g. A natural, or B flat.
+
+    Notes are interned, so there is only ever one instance of each note and two
+    notes are equal only if they are the same instance.
     """
 
     name: Name
     accidental: Accidental = Accidental.NATURAL
 
+    # Cached, as notes are rendered and compared far more often than created
+    _str: str = field(init=False, repr=False)
+    _offset: int = field(init=False, repr=False)
+
     class Mode(Enum):
         """Used when building a Note from a semitone offset, as each note could
         either be represented as a flat or sharp. We need some way to choose
@@ -105,80 +113,179 @@ class Note:
         11: (Name.A, Accidental.FLAT),
     }
 
-    def __str__(self) -> str:
-        return f"{self.name}{self.accidental}"
+    # Every note created so far, by name and accidental
+    _interned: ClassVar[dict[tuple[Name, Accidental], "Note"]] = {}
+    # The note for each offset from A within an octave, for each mode, filled
+    # in once the module has loaded
+    _by_offset: ClassVar[dict[Mode, tuple["Note", ...]]] = {}
+
+    def __new__(cls, name: Name, accidental: Accidental = Accidental.NATURAL):
+        note = cls._interned.get((name, accidental))
+        if note is None:
+            note = object.__new__(cls)
+            object.__setattr__(note, "name", name)
+            object.__setattr__(note, "accidental", accidental)
+            object.__setattr__(note, "_str", f"{name}{accidental}")
+            object.__setattr__(note, "_offset", name.value + accidental.value)
+            cls._interned[(name, accidental)] = note
+        return note
+
+    def __init__(self, name: Name, accidental: Accidental = Accidental.NATURAL):
+        # Everything is already set up by `__new__`
+        pass
+
+    def __reduce__(self):
+        # Copies and unpickled notes are interned too
+        return Note, (self.name, self.accidental)
 
-    def __hash__(self) -> int:
-        return hash((self.name, self.accidental))
+    def __str__(self) -> str:
+        return self._str
 
     @property
     def offset(self) -> int:
         """The offset of this note from A."""
-        return self.name.value + self.accidental.value
+        return self._offset
 
     @classmethod
     def from_offset(cls, offset: int, mode: Mode) -> Self:
         """Returns a Note given its semitone offset from A4."""
-        note = offset % 12
-
-        if note in cls.NATURALS.keys():
-            return cls(*cls.NATURALS[note])
-
-        match mode:
-            case cls.Mode.SHARPS:
-                return cls(*cls.SHARPS[note])
-            case cls.Mode.FLATS:
-                return cls(*cls.FLATS[note])
+        return cls._by_offset[mode][offset % 12]
 
 
-@dataclass
+@dataclass(frozen=True, slots=True, eq=False)
 class Pitch:
-    """A pitch is defined as a note with an octave, for example A sharp 4."""
+    """A pitch is defined as a note with an octave, for example A sharp 4.
+
+    Like notes, pitches are interned.
+    """
 
     note: Note
     octave: int
 
-    def __str__(self) -> str:
-        return f"{self.note}{self.octave}"
+    _str: str = field(init=False, repr=False)
+    _offset: int = field(init=False, repr=False)
+
+    # Every pitch created so far, by note and octave
+    _interned: ClassVar[dict[tuple[Note, int], "Pitch"]] = {}
+    # The pitch for each offset from the lowest, for each mode, filled in once
+    # the module has loaded
+    _by_offset: ClassVar[dict[Note.Mode, tuple["Pitch", ...]]] = {}
+
+    # Offset of the lowest pitch in the lookup tables, C0. Far more than any
+    # instrument can play is covered, up to B8.
+    LOWEST = Name.C.value - 4 * 12
+    RANGE = 9 * 12
+
+    def __new__(cls, note: Note, octave: int):
+        # Offsets handed over as NumPy integers shouldn't be kept around
+        octave = int(octave)
+        pitch = cls._interned.get((note, octave))
+        if pitch is None:
+            pitch = object.__new__(cls)
+            object.__setattr__(pitch, "note", note)
+            object.__setattr__(pitch, "octave", octave)
+            object.__setattr__(pitch, "_str", f"{note}{octave}")
+            object.__setattr__(pitch, "_offset", note.offset + (octave - 4) * 12)
+            cls._interned[(note, octave)] = pitch
+        return pitch
+
+    def __init__(self, note: Note, octave: int):
+        # Everything is already set up by `__new__`
+        pass
+
+    def __reduce__(self):
+        return Pitch, (self.note, self.octave)
 
-    def __hash__(self) -> int:
-        return hash((self.note, self.octave))
+    def __str__(self) -> str:
+        return self._str
 
     @property
     def offset(self) -> int:
         """The offset of this pitch from A4."""
-        return self.note.offset + (self.octave - 4) * 12
+        return self._offset
 
     @classmethod
     def from_offset(cls, offset: int, mode: Note.Mode) -> Self:
         """Returns a Pitch given its semitone offset from A4."""
+        index = offset - cls.LOWEST
+        if 0 <= index < cls.RANGE:
+            return cls._by_offset[mode][index]
         return cls(Note.from_offset(offset, mode), offset_to_octave(offset))
 
 
-def frequency_to_offset(frequency: float) -> int:
+# The pitch maths below works on a single number or a whole array at once.
+# Arrays are converted in a single NumPy call, while single numbers take a fast
+# path through `math`, which is several times quicker than NumPy for a scalar.
+Offsets = int | np.ndarray
+Frequencies = float | np.ndarray
+
+
+def frequency_to_offset(frequency: Frequencies) -> Offsets:
     """Returns the nearest semitone offset of a note from A4, given the note's
     frequency."""
-    return round(frequency_to_offset_unrounded(frequency))
+    unrounded = frequency_to_offset_unrounded(frequency)
+    if isinstance(unrounded, np.ndarray):
+        # Rounds half to even, like `round`
+        return np.rint(unrounded).astype(int)
+    return round(unrounded)
 
 
-def frequency_to_offset_unrounded(frequency: float) -> int:
+def frequency_to_offset_unrounded(frequency: Frequencies) -> Frequencies:
     """Returns the semitone offset of a note from A4, given the note's
     frequency."""
-    return 12 * np.log2(frequency / 440)
+    if isinstance(frequency, np.ndarray):
+        return 12 * np.log2(frequency / 440)
+    return 12 * math.log2(frequency / 440)
 
 
-def offset_to_frequency(offset: int) -> float:
+def offset_to_frequency(offset: Offsets | float) -> Frequencies:
     """Returns the frequency of a note, given the note's offset from A4."""
+    if isinstance(offset, np.ndarray):
+        return 440 * np.exp2(offset / 12)
     return 440 * 2 ** (offset / 12)
 
 
-def offset_to_octave(offset: int) -> int:
+def offset_to_octave(offset: Offsets) -> Offsets:
     """Returns the octave of a note (C incremented) given its semitone offset
     from A4."""
     C_OFFSET = Name.C.value  # Octaves start at C, not A.
     return (offset - C_OFFSET) // 12 + 4  # Offset zero is octave 4.
 
 
+def offset_to_note_index(offset: Offsets) -> Offsets:
+    """Returns the semitone offset of a note from the A below it, ignoring the
+    octave, e.g. 1 for any A sharp."""
+    return offset % 12
+
+
+def cents_deviation(frequency: Frequencies) -> Frequencies:
+    """Returns how far a frequency is from the nearest semitone, in cents
+    between -50 and 50."""
+    unrounded = frequency_to_offset_unrounded(frequency)
+    if isinstance(unrounded, np.ndarray):
+        return 100 * (unrounded - np.rint(unrounded))
+    return 100 * (unrounded - round(unrounded))
+
+
+def _fill_tables():
+    """Fills in the `from_offset` lookup tables of `Note` and `Pitch`."""
+    for mode in Note.Mode:
+        match mode:
+            case Note.Mode.SHARPS:
+                notes = Note.NATURALS | Note.SHARPS
+            case Note.Mode.FLATS:
+                notes = Note.NATURALS | Note.FLATS
+        Note._by_offset[mode] = tuple(Note(*notes[offset]) for offset in range(12))
+
+        Pitch._by_offset[mode] = tuple(
+            Pitch(Note._by_offset[mode][offset % 12], offset_to_octave(offset))
+            for offset in range(Pitch.LOWEST, Pitch.LOWEST + Pitch.RANGE)
+        )
+
+
+_fill_tables()
+
+
 class TestNotes:
     def test_frequency_to_offset(self):
         # Test octave As
@@ -260,3 +367,40 @@ class TestNotes:
             ),
             4,
         )
+
+    def test_arrays(self):
+        frequencies = np.array([440, 880, 110, 987.77, 350, 1180, 466])
+        offsets = frequency_to_offset(frequencies)
+        # Every element matches the scalar fast path
+        assert offsets.tolist() == [frequency_to_offset(f) for f in frequencies]
+        assert offset_to_octave(offsets).tolist() == [4, 5, 2, 5, 4, 6, 4]
+        assert offset_to_note_index(offsets).tolist() == [0, 0, 0, 2, 8, 5, 1]
+        assert np.allclose(offset_to_frequency(offsets)[:3], [440, 880, 110])
+
+        # A quarter tone sharp, and a little flat
+        cents = cents_deviation(offset_to_frequency(np.array([0.25, 2.9])))
+        assert np.allclose(cents, [25.0, -10.0])
+        assert math.isclose(cents_deviation(offset_to_frequency(0.25)), 25.0)
+
+    def test_interned(self):
+        import copy
+        import pickle
+        from dataclasses import FrozenInstanceError
+
+        pitch = Pitch.from_offset(1, Note.Mode.FLATS)
+        assert pitch is Pitch(Note(Name.B, Accidental.FLAT), 4)
+        assert pitch is not Pitch.from_offset(1, Note.Mode.SHARPS)
+        assert str(pitch) == "B♭4"
+        assert pitch.offset == 1
+
+        # Outside the lookup tables
+        assert Pitch.from_offset(-60, Note.Mode.SHARPS) is Pitch(Note(Name.A), -1)
+        # Copies are interned too
+        assert copy.deepcopy(pitch) is pitch
+        assert pickle.loads(pickle.dumps(pitch)) is pitch
+
+        try:
+            pitch.octave = 5
+            assert False, "pitches should be frozen"
+        except FrozenInstanceError:
+            pass
@@ -0,0 +1,146 @@
+"""A lightweight way for the engine to tell the rest of the application what
+happened, without depending on any GUI toolkit."""
+
+from types import MethodType
+from typing import Callable, ClassVar, Protocol
+from weakref import WeakMethod
+
+
+class Scheduler(Protocol):
+    """Calls a function regularly on a main loop, such as `pyglet.clock`."""
+
+    def schedule(self, func: Callable[[float], None]):
+        """Calls `func` once per tick of the main loop, with the seconds since
+        the last call."""
+        ...
+
+    def unschedule(self, func: Callable[[float], None]):
+        """Stops calling `func`."""
+        ...
+
+
+class Observable:
+    """Dispatches named events to every handler subscribed to them.
+
+    Handlers are subscribed the same way as to a pyglet `EventDispatcher`: an
+    object's methods are picked out by the names of the events, or functions
+    are matched up by their own names or by keyword. Methods are only weakly
+    referenced, so a handler going away unsubscribes it without anything
+    needing to remember to.
+
+    Events are dispatched on whichever thread calls `dispatch_event`, to every
+    handler in the order they were subscribed.
+    """
+
+    event_types: ClassVar[list[str]] = []
+
+    @classmethod
+    def register_event_type(cls, name: str):
+        """Declares an event that handlers can subscribe to."""
+        # Each subclass gets its own list, rather than adding to its parent's
+        if "event_types" not in cls.__dict__:
+            cls.event_types = list(cls.event_types)
+        cls.event_types.append(name)
+
+    def __init__(self):
+        # Every handler subscribed to each event
+        self._handlers: dict[str, list[Callable | WeakMethod]] = {}
+
+    def _match(self, args: tuple, kwargs: dict) -> list[tuple[str, Callable]]:
+        """Pairs each handler up with the event it handles."""
+        matched: list[tuple[str, Callable]] = []
+        for obj in args:
+            if callable(obj) and hasattr(obj, "__name__"):
+                # A function handles the event it is named after
+                if obj.__name__ not in self.event_types:
+                    raise ValueError(f"Unknown event {obj.__name__}")
+                matched.append((obj.__name__, obj))
+            else:
+                # An object handles every event it has a method for
+                for name in self.event_types:
+                    handler = getattr(obj, name, None)
+                    if handler is not None:
+                        matched.append((name, handler))
+
+        for name, handler in kwargs.items():
+            if name not in self.event_types:
+                raise ValueError(f"Unknown event {name}")
+            matched.append((name, handler))
+        return matched
+
+    def push_handlers(self, *args, **kwargs):
+        """Subscribes handlers to their events."""
+        for name, handler in self._match(args, kwargs):
+            if isinstance(handler, MethodType):
+                handler = WeakMethod(handler)
+            self._handlers.setdefault(name, []).append(handler)
+
+    def set_handler(self, name: str, handler: Callable):
+        """Subscribes a single handler to an event."""
+        self.push_handlers(**{name: handler})
+
+    def remove_handlers(self, *args, **kwargs):
+        """Unsubscribes handlers from their events."""
+        for name, handler in self._match(args, kwargs):
+            handlers = self._handlers.get(name, [])
+            for subscribed in handlers:
+                if self._resolve(subscribed) == handler:
+                    handlers.remove(subscribed)
+                    break
+
+    @staticmethod
+    def _resolve(handler: Callable | WeakMethod) -> Callable | None:
+        """The handler itself, or None if it has gone away."""
+        if isinstance(handler, WeakMethod):
+            return handler()
+        return handler
+
+    def dispatch_event(self, name: str, *args):
+        """Calls every handler subscribed to an event with the arguments."""
+        assert name in self.event_types, f"Unknown event {name}"
+
+        handlers = self._handlers.get(name)
+        if not handlers:
+            return
+        # Copied, as a handler may subscribe or unsubscribe others
+        for subscribed in list(handlers):
+            handler = self._resolve(subscribed)
+            if handler is None:
+                handlers.remove(subscribed)
+                continue
+            handler(*args)
+
+
+class TestObservable:
+    def test_dispatch(self):
+        class Counter(Observable):
+            pass
+
+        Counter.register_event_type("on_count")
+        # Registered on the subclass alone
+        assert Observable.event_types == []
+
+        class Listener:
+            def __init__(self):
+                self.counts = []
+
+            def on_count(self, count: int):
+                self.counts.append(count)
+
+        counter = Counter()
+        listener = Listener()
+        counts = []
+        counter.push_handlers(listener, on_count=counts.append)
+        counter.dispatch_event("on_count", 1)
+        assert listener.counts == [1]
+        assert counts == [1]
+
+        counter.remove_handlers(on_count=counts.append)
+        counter.dispatch_event("on_count", 2)
+        assert listener.counts == [1, 2]
+        assert counts == [1]
+
+        # A listener that goes away is unsubscribed with it
+        del listener
+        counter.dispatch_event("on_count", 3)
+        assert counter._handlers["on_count"] == []
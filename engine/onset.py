@@ -0,0 +1,151 @@
+"""Spots the start of each new note, so the pitch tracker can stop listening to
+the last one."""
+
+import numpy as np
+
+from .analysis import MagnitudeSpectrum
+from .ring_buffer import RingBuffer
+
+
+class OnsetDetector:
+    """Detects plucks from the spectral flux of the input.
+
+    Every block, the latest frame of audio is transformed and compared with the
+    frame from the block before. A pluck brings in energy at frequencies that
+    weren't there before, so the total rise in (log) magnitude across every
+    bin, the flux, jumps. A decaying or sustained note only ever loses energy,
+    so it barely registers, however loud it is.
+
+    Neighbouring harmonics of a low note share bins, and beat against each
+    other from one frame to the next. So, as in SuperFlux, each bin is compared
+    against the loudest of its neighbours in the previous frame, rather than
+    just itself.
+
+    An onset is reported when the flux jumps well above its recent average.
+    """
+
+    # Frames in each transformed frame of audio
+    frame_length: int = 2**10
+    # How far the flux must rise above its recent average
+    ratio: float = 2.0
+    # The minimum flux, so that background noise can't trigger an onset
+    min_flux: float = 0.5
+    # Time constant of the flux average, in seconds
+    smoothing: float = 0.25
+    # The shortest time between two onsets, in seconds
+    refractory: float = 0.05
+
+    def __init__(self, sample_rate: int):
+        self.sample_rate = sample_rate
+
+        # Every buffer is allocated up front, as this runs on every callback
+        self._frame = RingBuffer(self.frame_length)
+        bins = self.frame_length // 2 + 1
+        self._window = np.hanning(self.frame_length).astype(np.float32)
+        self._windowed = np.zeros(self.frame_length, dtype=np.float32)
+        self._transform = MagnitudeSpectrum(self.frame_length)
+        # Log magnitude spectra of the current and previous frames
+        self._magnitude = np.zeros(bins, dtype=np.float32)
+        self._previous = np.zeros(bins, dtype=np.float32)
+        # The previous spectrum, spread across neighbouring bins
+        self._reference = np.zeros(bins, dtype=np.float32)
+        self._rise = np.zeros(bins, dtype=np.float32)
+
+        # Whether there is a previous frame to compare against
+        self._primed = False
+        # Running average of the flux
+        self.average = 0.0
+        self.flux = 0.0
+        # Frames since the last onset, starting out of the refractory period
+        self._frames_since_onset = int(self.refractory * sample_rate)
+
+    def process(self, block: np.ndarray) -> bool:
+        """Adds a block of samples, returning whether a note started in it."""
+        if len(block) == 0:
+            return False
+
+        self._frame.write(block)
+        self._frames_since_onset += len(block)
+        if not self._frame.full:
+            return False
+
+        np.copyto(self._windowed, self._frame.view())
+        np.multiply(self._windowed, self._window, out=self._windowed)
+
+        # Compress the magnitudes, so quiet harmonics count as well as loud
+        # ones
+        self._previous, self._magnitude = self._magnitude, self._previous
+        self._transform(self._windowed, self._magnitude)
+        np.log1p(self._magnitude, out=self._magnitude)
+
+        np.copyto(self._reference, self._previous)
+        np.maximum(self._reference[1:], self._previous[:-1], out=self._reference[1:])
+        np.maximum(self._reference[:-1], self._previous[1:], out=self._reference[:-1])
+
+        # Only rises in magnitude count towards the flux
+        np.subtract(self._magnitude, self._reference, out=self._rise)
+        np.maximum(self._rise, 0.0, out=self._rise)
+        self.flux = float(self._rise.sum())
+
+        onset = (
+            self._primed
+            and self.flux > self.ratio * self.average
+            and self.flux > self.min_flux
+            and self._frames_since_onset >= self.refractory * self.sample_rate
+        )
+        if onset:
+            self._frames_since_onset = 0
+        self._primed = True
+
+        # The average adapts at the same rate whatever size blocks arrive in
+        decay = np.exp(-len(block) / (self.sample_rate * self.smoothing))
+        self.average = decay * self.average + (1 - decay) * self.flux
+
+        return onset
+
+
+class TestOnsetDetector:
+    def test_onsets(self):
+        detector = OnsetDetector(8000)
+        time = np.arange(8000) / 8000
+        rng = np.random.default_rng(0)
+        # Two decaying notes half a second apart, over a little noise
+        signal = rng.normal(0.0, 0.001, 8000)
+        for start, frequency in ((0.25, 220.0), (0.75, 330.0)):
+            note = np.exp(-3 * (time - start)) * np.sin(
+                2 * np.pi * frequency * (time - start)
+            )
+            signal += np.where(time >= start, note, 0.0)
+
+        onsets = [
+            start / 8000
+            for start in range(0, 8000, 256)
+            if detector.process(signal[start : start + 256].astype(np.float32))
+        ]
+        assert len(onsets) == 2
+        assert abs(onsets[0] - 0.25) < 0.05
+        assert abs(onsets[1] - 0.75) < 0.05
+
+    def test_no_allocations(self):
+        import tracemalloc
+
+        detector = OnsetDetector(8000)
+        block = np.random.default_rng(0).normal(0.0, 0.1, 256).astype(np.float32)
+        # Fill the frame first
+        for _ in range(8):
+            detector.process(block)
+
+        tracemalloc.start()
+        try:
+            peaks = []
+            for _ in range(10):
+                current, _ = tracemalloc.get_traced_memory()
+                tracemalloc.reset_peak()
+                detector.process(block)
+                peaks.append(tracemalloc.get_traced_memory()[1] - current)
+        finally:
+            tracemalloc.stop()
+
+        # As for the pitch detectors, only a few small Python objects are
+        # made, less than even a single magnitude spectrum
+        assert max(peaks) < 2**11 < detector._magnitude.nbytes
@@ -0,0 +1,526 @@
+"""The pitch detection algorithms available to the `SoundManager`.
+
+Every detector follows the `PitchDetector` protocol, taking a window of float32
+samples and returning the fundamental frequency alongside a confidence. A
+detector can also be built for several channels at once, taking a window of
+each.
+
+Each detector is built for the lowest fundamental it needs to resolve, which
+sets the length of window it expects. The harmonic product spectrum works in
+the frequency domain, so its window must hold a couple of dozen periods of the
+lowest note. YIN, the McLeod pitch method and autocorrelation all work in the
+time domain, where a window only needs to hold a few periods.
+"""
+
+from enum import Enum
+from typing import Protocol
+
+import numpy as np
+
+from .analysis import AnalysisPlan
+
+
+def interpolated_peak(alpha, beta, gamma):
+    """Quadratic interpolation of the peak of a parabola.
+
+    This is used by the peak detection of the pitch tracker to ensure we get a
+    precise enough reading. Works just as well for troughs.
+    """
+    return 0.5 * (alpha - gamma) / (alpha - 2 * beta + gamma)
+
+
+class PitchDetector(Protocol):
+    """Estimates the fundamental frequency of a window of samples."""
+
+    sample_rate: int
+    # The lowest fundamental the detector can resolve, in Hz
+    min_frequency: float
+    # Readings with at least this confidence can be trusted without a second
+    # opinion from a longer window
+    trusted_confidence: float
+    # The length of window the detector expects, in seconds and frames
+    window_size: float
+    window_length: int
+    # The number of channels `detect_channels` expects a window of
+    channels: int
+    # The highest harmonic of the fundamental the detector makes use of, the
+    # audio can be filtered down to just below it
+    harmonics: int
+    # The range of fundamentals that can be played, in Hz, if known. Nothing
+    # outside it is ever read.
+    band: tuple[float, float] | None
+
+    # How long readings must hold steady before their offset is broadcast, in
+    # seconds, and how far they may wander while holding, in cents
+    hold: float
+    tolerance: float
+    # How far past a semitone boundary a reading must be to move on from the
+    # last offset, in cents
+    hysteresis: float
+
+    def __init__(
+        self,
+        sample_rate: int,
+        min_frequency: float | None = None,
+        channels: int = 1,
+        band: tuple[float, float] | None = None,
+    ):
+        ...
+
+    def detect(self, window: np.ndarray) -> tuple[float | None, float]:
+        """Returns the fundamental frequency of the window, or None if there
+        isn't one, alongside a confidence between 0 and 1."""
+        ...
+
+    def detect_channels(self, windows: np.ndarray) -> list[tuple[float | None, float]]:
+        """Returns the fundamental frequency and confidence of a window of
+        each channel, passed as a 2D array with a row per channel, for up to
+        `channels` channels."""
+        ...
+
+
+class HarmonicProductSpectrum:
+    """Multiplies the spectrum with downsampled copies of itself, so that the
+    harmonics of the fundamental line up and reinforce its peak.
+
+    Every channel is transformed in a single batched FFT, which costs far less
+    than transforming each on its own.
+
+    Given a band, the product is only taken, and its peak only searched for,
+    between the band's bins. Besides saving work, a peak outside the range of
+    the instrument can never be mistaken for the fundamental.
+    """
+
+    # The lowest fundamental to resolve, unless told otherwise
+    min_frequency: float = 40.0
+    # Periods of the lowest fundamental the window must hold
+    periods: float = 24.0
+    # How much longer the zero padded window is than the window itself
+    padding: float = 1.5
+    # The total number of harmonics to work with in the harmonic product
+    # spectrum
+    harmonics: int = 4
+    # Anything below this is probably background noise
+    noise_floor: float = 20.0
+    trusted_confidence: float = 0.5
+    # Readings are steady from one window to the next
+    hold: float = 0.03
+    tolerance: float = 25.0
+    hysteresis: float = 15.0
+
+    def __init__(
+        self,
+        sample_rate: int,
+        min_frequency: float | None = None,
+        channels: int = 1,
+        band: tuple[float, float] | None = None,
+    ):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.band = band
+        if min_frequency is not None:
+            self.min_frequency = min_frequency
+
+        # The size of the sliding window in seconds, 0.6s for the default
+        self.window_size = self.periods / self.min_frequency
+        self.plan = AnalysisPlan(
+            sample_rate,
+            self.window_size,
+            self.window_size * self.padding,
+            self.harmonics,
+            channels,
+            band,
+        )
+        self.window_length = self.plan.window_length
+
+        # The peak bin and total of each channel's HPS
+        self._peaks = np.zeros(channels, dtype=np.intp)
+        self._totals = np.zeros(channels, dtype=np.float32)
+
+    def detect(self, window: np.ndarray) -> tuple[float | None, float]:
+        return self.detect_channels(window[np.newaxis])[0]
+
+    def detect_channels(self, windows: np.ndarray) -> list[tuple[float | None, float]]:
+        # Windowed, zero padded magnitude spectra
+        signal = self.plan.transform(windows)
+
+        # Take HPS
+        hps = self.plan.harmonic_product(signal)
+
+        # Only the positive half of the spectrum was transformed, and only the
+        # band of the HPS was taken, so the whole of it is searched
+        hps.argmax(axis=-1, out=self._peaks[: len(hps)])
+        hps.sum(axis=-1, out=self._totals[: len(hps)])
+
+        return [
+            self._read_peak(signal[channel], hps[channel], channel)
+            for channel in range(len(hps))
+        ]
+
+    def _read_peak(
+        self, signal: np.ndarray, hps: np.ndarray, channel: int
+    ) -> tuple[float | None, float]:
+        """Converts the peak of a single row of the HPS to a frequency."""
+        local = int(self._peaks[channel])
+
+        # Confidence is the share of the HPS that sits around the peak
+        total = self._totals[channel]
+        # A window of pure silence has no peak at all
+        if total == 0:
+            return None, 0.0
+        confidence = float(hps[max(local - 2, 0) : local + 3].sum() / total)
+
+        # The HPS starts at the bottom of the band
+        peak = local + self.plan.low_bin
+
+        # Quadratic Interpolation
+        if 0 < peak < len(signal) - 1:
+            alpha = signal[peak - 1]
+            beta = signal[peak]
+            gamma = signal[peak + 1]
+            peak += interpolated_peak(alpha, beta, gamma)
+
+        # Bin -> Frequency Conversion
+        frequency = peak * self.plan.bin_size
+
+        if frequency > self.noise_floor:
+            return float(frequency), confidence
+        return None, confidence
+
+
+class TimeDomainDetector:
+    """Shared setup for the detectors that search over lags (periods) rather
+    than frequencies."""
+
+    # The range of fundamentals to search for, in Hz. The lowest can be
+    # overridden per detector.
+    min_frequency: float = 30.0
+    max_frequency: float = 1500.0
+    # Periods of the lowest fundamental the window must hold
+    periods: float = 3.0
+    trusted_confidence: float = 0.85
+    # Enough of the waveform's shape to place its period precisely
+    harmonics: int = 4
+    # Short windows jitter more, so must hold for longer
+    hold: float = 0.05
+    tolerance: float = 25.0
+    hysteresis: float = 15.0
+
+    def __init__(
+        self,
+        sample_rate: int,
+        min_frequency: float | None = None,
+        channels: int = 1,
+        band: tuple[float, float] | None = None,
+    ):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.band = band
+        if min_frequency is not None:
+            self.min_frequency = min_frequency
+        # Nothing above the band is searched for. The bottom of the band is
+        # already covered by the window, which can't hold any longer lags.
+        if band is not None:
+            self.max_frequency = band[1]
+
+        # The size of the sliding window in seconds, 0.1s for the default
+        self.window_size = self.periods / self.min_frequency
+        self.window_length = int(sample_rate * self.window_size)
+
+        # The range of lags to search, the window must hold at least two
+        # periods of the longest one
+        self.min_lag = max(int(sample_rate / self.max_frequency), 1)
+        self.max_lag = min(
+            int(np.ceil(sample_rate / self.min_frequency)),
+            self.window_length // 2,
+        )
+
+        # Correlations are taken with FFTs, padded so that they don't wrap
+        self.fft_size = 1 << (2 * self.window_length - 1).bit_length()
+        self.padded = np.zeros(self.fft_size)
+
+        # Cumulative energy of the window, with a leading zero
+        self.energy = np.zeros(self.window_length + 1)
+
+    def detect_channels(self, windows: np.ndarray) -> list[tuple[float | None, float]]:
+        # The lag search differs too much from one window to the next to
+        # batch, so each channel is detected in turn
+        return [self.detect(window) for window in windows]
+
+    def _autocorrelation(self, window: np.ndarray) -> np.ndarray:
+        """Returns the autocorrelation of the window for every lag up to the
+        maximum."""
+        self.padded[: self.window_length] = window
+        spectrum = np.fft.rfft(self.padded)
+        power = spectrum.real**2 + spectrum.imag**2
+        return np.fft.irfft(power, self.fft_size)[: self.max_lag + 2]
+
+    def _cumulative_energy(self, window: np.ndarray) -> np.ndarray:
+        """Returns the running sum of squares of the window, where index `i`
+        holds the energy of the first `i` samples."""
+        np.cumsum(np.square(window, dtype=np.float64), out=self.energy[1:])
+        return self.energy
+
+    def _interpolated_lag(self, function: np.ndarray, lag: int) -> float:
+        """Refines a peak or trough of a function of lag."""
+        if 0 < lag < len(function) - 1:
+            return lag + interpolated_peak(
+                function[lag - 1],
+                function[lag],
+                function[lag + 1],
+            )
+        return float(lag)
+
+
+class Yin(TimeDomainDetector):
+    """The YIN algorithm, which looks for the first lag where the cumulative
+    mean normalised difference of the window with itself dips below a
+    threshold."""
+
+    # Dips shallower than this are not considered periodic
+    threshold: float = 0.15
+
+    def __init__(
+        self,
+        sample_rate: int,
+        min_frequency: float | None = None,
+        channels: int = 1,
+        band: tuple[float, float] | None = None,
+    ):
+        super().__init__(sample_rate, min_frequency, channels, band)
+        # The difference function compares a fixed length of the window
+        # against each lagged copy
+        self.integration_length = self.window_length - self.max_lag
+        self.head = np.zeros(self.fft_size)
+
+    def detect(self, window: np.ndarray) -> tuple[float | None, float]:
+        length = self.integration_length
+        energy = self._cumulative_energy(window)
+        if energy[length] == 0.0:
+            return None, 0.0
+
+        # Cross correlation of the start of the window with each lagged copy
+        self.head[:length] = window[:length]
+        self.padded[: self.window_length] = window
+        cross = np.fft.irfft(
+            np.conj(np.fft.rfft(self.head)) * np.fft.rfft(self.padded),
+            self.fft_size,
+        )[: self.max_lag + 1]
+
+        # Difference function, expanded as energy terms and a correlation
+        lags = np.arange(self.max_lag + 1)
+        difference = energy[length] + energy[lags + length] - energy[lags]
+        difference -= 2 * cross
+
+        # Cumulative mean normalised difference
+        normalised = np.ones(self.max_lag + 1)
+        running = np.cumsum(difference[1:])
+        np.divide(
+            difference[1:] * lags[1:],
+            running,
+            out=normalised[1:],
+            where=running > 0.0,
+        )
+
+        # First dip under the threshold, followed down to its minimum
+        search = normalised[self.min_lag : self.max_lag]
+        below = np.flatnonzero(search < self.threshold)
+        if len(below) == 0:
+            return None, float(np.clip(1.0 - np.min(search), 0.0, 1.0))
+
+        lag = int(below[0]) + self.min_lag
+        while lag + 1 < self.max_lag and normalised[lag + 1] < normalised[lag]:
+            lag += 1
+
+        confidence = float(np.clip(1.0 - normalised[lag], 0.0, 1.0))
+        return self.sample_rate / self._interpolated_lag(normalised, lag), confidence
+
+
+class McLeod(TimeDomainDetector):
+    """The McLeod pitch method, which picks the first key maximum of the
+    normalised square difference function that comes close to the highest
+    one."""
+
+    # Key maxima within this fraction of the highest are candidates
+    cutoff: float = 0.9
+    # Below this clarity the window is not considered periodic
+    min_clarity: float = 0.5
+
+    def detect(self, window: np.ndarray) -> tuple[float | None, float]:
+        correlation = self._autocorrelation(window)[: self.max_lag + 1]
+        energy = self._cumulative_energy(window)
+
+        # Normalised square difference function
+        lags = np.arange(self.max_lag + 1)
+        total = energy[self.window_length - lags] + (
+            energy[self.window_length] - energy[lags]
+        )
+        nsdf = np.zeros(self.max_lag + 1)
+        np.divide(2 * correlation, total, out=nsdf, where=total > 0.0)
+
+        # Key maxima are the highest points of each positive region, after the
+        # zero lag peak has first gone negative
+        negative = np.flatnonzero(nsdf < 0.0)
+        if len(negative) == 0:
+            return None, 0.0
+        positive = nsdf[negative[0] :] > 0.0
+        edges = np.flatnonzero(np.diff(positive.astype(np.int8))) + 1
+        starts = edges[::2] + negative[0]
+        ends = np.append(edges[1::2] + negative[0], len(nsdf))[: len(starts)]
+
+        maxima = [
+            start + int(np.argmax(nsdf[start:end]))
+            for start, end in zip(starts, ends)
+            if end > self.min_lag
+        ]
+        maxima = [lag for lag in maxima if lag >= self.min_lag]
+        if len(maxima) == 0:
+            return None, 0.0
+
+        highest = max(nsdf[lag] for lag in maxima)
+        lag = next(lag for lag in maxima if nsdf[lag] >= self.cutoff * highest)
+
+        clarity = float(np.clip(nsdf[lag], 0.0, 1.0))
+        if clarity < self.min_clarity:
+            return None, clarity
+        return self.sample_rate / self._interpolated_lag(nsdf, lag), clarity
+
+
+class Autocorrelation(TimeDomainDetector):
+    """Picks the first peak of the autocorrelation after the zero lag peak that
+    comes close to the highest one."""
+
+    # Peaks within this fraction of the highest are candidates, so that whole
+    # multiples of the period aren't mistaken for it
+    cutoff: float = 0.9
+    # Below this normalised correlation the window is not considered periodic
+    min_correlation: float = 0.5
+
+    def detect(self, window: np.ndarray) -> tuple[float | None, float]:
+        correlation = self._autocorrelation(window)[: self.max_lag + 1]
+        if correlation[0] <= 0.0:
+            return None, 0.0
+        correlation = correlation / correlation[0]
+
+        # Skip past the zero lag peak before searching
+        negative = np.flatnonzero(correlation < 0.0)
+        if len(negative) == 0:
+            return None, 0.0
+        start = max(int(negative[0]), self.min_lag)
+        if start >= self.max_lag:
+            return None, 0.0
+
+        # Climb from the first candidate up to its peak
+        search = correlation[start:]
+        lag = start + int(np.argmax(search >= self.cutoff * np.max(search)))
+        while lag + 1 <= self.max_lag and correlation[lag + 1] > correlation[lag]:
+            lag += 1
+
+        # Undo the bias towards short lags so confidence is comparable
+        confidence = float(
+            np.clip(
+                correlation[lag] * self.window_length / (self.window_length - lag),
+                0.0,
+                1.0,
+            )
+        )
+        if confidence < self.min_correlation:
+            return None, confidence
+        return self.sample_rate / self._interpolated_lag(correlation, lag), confidence
+
+
+class Detector(Enum):
+    """Each available pitch detector."""
+
+    HPS = HarmonicProductSpectrum
+    YIN = Yin
+    MPM = McLeod
+    AUTOCORRELATION = Autocorrelation
+
+
+class TestPitchDetector:
+    @staticmethod
+    def tone(frequency: float, sample_rate: int, length: int) -> np.ndarray:
+        """A harmonically rich test tone."""
+        time = np.arange(length) / sample_rate
+        return sum(
+            0.5 / n * np.sin(2 * np.pi * frequency * n * time) for n in range(1, 6)
+        ).astype(np.float32)
+
+    def test_detectors(self):
+        sample_rate = 44100
+        for detector in Detector:
+            pitch_detector = detector.value(sample_rate)
+            length = int(sample_rate * pitch_detector.window_size)
+            for frequency in (82.41, 220.0, 659.25):
+                detected, confidence = pitch_detector.detect(
+                    self.tone(frequency, sample_rate, length)
+                )
+                assert detected is not None, detector
+                # Within 10 cents
+                assert abs(1200 * np.log2(detected / frequency)) < 10, detector
+                assert 0.0 <= confidence <= 1.0
+
+    def test_channels(self):
+        sample_rate = 44100
+        frequencies = (82.41, 220.0, 659.25)
+        for detector in Detector:
+            pitch_detector = detector.value(sample_rate, channels=len(frequencies))
+            windows = np.stack(
+                [
+                    self.tone(frequency, sample_rate, pitch_detector.window_length)
+                    for frequency in frequencies
+                ]
+            )
+            # Each channel reads the same as it would on its own
+            single = detector.value(sample_rate)
+            for window, (detected, confidence) in zip(
+                windows, pitch_detector.detect_channels(windows)
+            ):
+                assert (detected, confidence) == single.detect(window), detector
+
+    def test_band(self):
+        sample_rate = 44100
+        window_length = HarmonicProductSpectrum(sample_rate, 77.8).window_length
+        # A loud hum, below anything a guitar can play
+        window = self.tone(220.0, sample_rate, window_length)
+        window += 4 * self.tone(30.0, sample_rate, window_length)
+
+        pitch_detector = HarmonicProductSpectrum(sample_rate, 77.8, band=(77.8, 1396.9))
+        detected, _ = pitch_detector.detect(window)
+        assert detected is not None
+        assert abs(1200 * np.log2(detected / 220.0)) < 10
+
+    def test_silence(self):
+        for detector in (Detector.YIN, Detector.MPM, Detector.AUTOCORRELATION):
+            pitch_detector = detector.value(44100)
+            frequency, _ = pitch_detector.detect(
+                np.zeros(pitch_detector.window_length, dtype=np.float32)
+            )
+            assert frequency is None
+
+    def test_no_allocations(self):
+        import tracemalloc
+
+        pitch_detector = HarmonicProductSpectrum(44100)
+        window = self.tone(220.0, 44100, pitch_detector.window_length)
+        # Warm up any of NumPy's and SciPy's caches first
+        pitch_detector.detect(window)
+
+        tracemalloc.start()
+        try:
+            # How far memory rises during each detection
+            peaks = []
+            for _ in range(10):
+                current, _ = tracemalloc.get_traced_memory()
+                tracemalloc.reset_peak()
+                pitch_detector.detect(window)
+                peaks.append(tracemalloc.get_traced_memory()[1] - current)
+        finally:
+            tracemalloc.stop()
+
+        # The only temporaries are views and NumPy's iterators, a couple of KB
+        # at most whatever the size of the window. Even the HPS is several
+        # times larger, and the spectrum far larger still.
+        assert pitch_detector.plan.hps.nbytes > 4 * 2**12
+        assert max(peaks) < 2**12
@@ -0,0 +1,280 @@
+"""Records the raw input of the pitch tracker to disk, so that a session can be
+replayed through it later.
+
+A recording starts with a header holding the sample format, number of channels
+and sample rate. Each block of audio follows exactly as it was captured,
+behind the number of frames in it and how it was timed: when it was captured
+on the source's own clock, how long before the callback that was, and when
+the callback was called.
+
+    header  "GTREC\\0", version (u16), format (u8), channels (u8), rate (u32),
+            padding to 16 bytes
+    block   frames (u64), device time in seconds or NaN without a clock (f64),
+            age in seconds (f64), callback time in seconds since the recording
+            started (f64), interleaved samples, padding to a multiple of 8
+            bytes
+    block   ...
+
+Everything is little-endian, and every block is kept 8-byte aligned, so the
+samples can be read straight out of a memory map. Stream time is counted in
+frames, so the frames of every block before one give its stream time.
+"""
+
+import math
+import mmap
+import struct
+from dataclasses import dataclass
+from enum import Enum
+from queue import Queue
+from threading import Thread
+from time import perf_counter
+from typing import Iterator
+
+import numpy as np
+
+
+MAGIC = b"GTREC\0"
+VERSION = 2
+HEADER = struct.Struct("<6sHBBI2x")
+BLOCK = struct.Struct("<Qddd")
+
+
+class SampleFormat(Enum):
+    """How samples are stored in a recording."""
+
+    # Exactly as captured
+    FLOAT32 = 1
+    # Half the size, at 16-bit resolution
+    INT16 = 2
+
+    @property
+    def dtype(self) -> np.dtype:
+        """The type of each stored sample."""
+        match self:
+            case SampleFormat.FLOAT32:
+                return np.dtype("<f4")
+            case SampleFormat.INT16:
+                return np.dtype("<i2")
+
+
+@dataclass(frozen=True)
+class RecordedBlock:
+    """A block of audio, and how it was timed as it was captured."""
+
+    # Float32 samples, with a column per channel if there are several
+    samples: np.ndarray
+    # Stream time of the first frame, in seconds
+    time: float
+    # When the block was captured on the source's own clock, None if it
+    # hasn't got one
+    device_time: float | None
+    # How many seconds before the callback the block was captured
+    age: float
+    # When the callback was called, in seconds since the recording started
+    called: float
+
+
+class Recorder:
+    """Writes each block of audio captured by the `SoundManager` to a file.
+
+    The capture callback only queues up the block it was handed, without
+    copying it. A background thread converts and writes each block, so a
+    slow disk can never hold up capture. The queue is unbounded, so nothing is
+    dropped while the disk catches up.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        sample_rate: int,
+        channels: int = 1,
+        sample_format: SampleFormat = SampleFormat.FLOAT32,
+    ):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sample_format = sample_format
+
+        self._file = open(path, "wb")
+        self._file.write(
+            HEADER.pack(MAGIC, VERSION, sample_format.value, channels, sample_rate)
+        )
+        # Callback times are kept relative to this
+        self._started = perf_counter()
+
+        # Blocks waiting to be written, ended with None
+        self._queue: Queue[
+            tuple[np.ndarray, float | None, float, float] | None
+        ] = Queue()
+        self._writer = Thread(
+            target=self._write_blocks,
+            name="Recorder",
+            daemon=True,
+        )
+        self._writer.start()
+
+    def write(
+        self,
+        samples: np.ndarray,
+        device_time: float | None,
+        age: float,
+        called: float,
+    ):
+        """Queues a block of float32 samples, with a column per channel, to be
+        written, timed as it was handed to the callback: when it was captured
+        on the source's clock, if it has one, how many seconds before the
+        callback that was, and the `perf_counter` time of the callback.
+
+        The block is held onto until it is written, so mustn't be changed in
+        the meantime.
+        """
+        self._queue.put((samples, device_time, age, called - self._started))
+
+    def close(self):
+        """Writes every queued block, then closes the file."""
+        self._queue.put(None)
+        self._writer.join()
+        self._file.close()
+
+    def _write_blocks(self):
+        """The writer thread's main loop."""
+        while (block := self._queue.get()) is not None:
+            samples, device_time, age, called = block
+            if self.sample_format is SampleFormat.INT16:
+                samples = np.clip(samples, -1.0, 1.0) * (2**15 - 1)
+            # Interleaved, in the stored format
+            data = samples.astype(self.sample_format.dtype, copy=False).tobytes()
+
+            if device_time is None:
+                device_time = math.nan
+            self._file.write(BLOCK.pack(len(samples), device_time, age, called))
+            self._file.write(data)
+            # Keep the next block aligned
+            self._file.write(bytes(-len(data) % 8))
+
+
+class Recording:
+    """Reads back a recording through a memory map, so that only the blocks
+    being replayed are ever loaded."""
+
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, sample_format, channels, sample_rate = HEADER.unpack_from(
+            self._map
+        )
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a recording")
+        if version != VERSION:
+            self.close()
+            raise ValueError(
+                f"{path} is a version {version} recording, only version "
+                f"{VERSION} can be read"
+            )
+        self.sample_format = SampleFormat(sample_format)
+        self.channels: int = channels
+        self.sample_rate: int = sample_rate
+
+    @staticmethod
+    def is_recording(path: str) -> bool:
+        """Whether a file is a recording, rather than some other audio."""
+        with open(path, "rb") as file:
+            return file.read(len(MAGIC)) == MAGIC
+
+    def __enter__(self) -> "Recording":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        try:
+            self._map.close()
+        except BufferError:
+            # A block is still being held onto, so the map is left to close
+            # itself once it is let go of
+            pass
+        self._file.close()
+
+    def blocks(self) -> Iterator[RecordedBlock]:
+        """Yields each block, exactly as it was captured.
+
+        Float32 blocks are views straight into the file, and keep it mapped
+        for as long as they are held onto.
+        """
+        dtype = self.sample_format.dtype
+        offset = HEADER.size
+        # Frames in every block so far
+        position = 0
+        while offset < len(self._map):
+            frames, device_time, age, called = BLOCK.unpack_from(self._map, offset)
+            offset += BLOCK.size
+
+            count = frames * self.channels
+            samples = np.frombuffer(self._map, dtype=dtype, count=count, offset=offset)
+            offset += count * dtype.itemsize
+            offset += -offset % 8
+
+            if self.sample_format is SampleFormat.INT16:
+                samples = samples.astype(np.float32) / (2**15 - 1)
+            if self.channels > 1:
+                samples = samples.reshape(frames, self.channels)
+            yield RecordedBlock(
+                samples,
+                position / self.sample_rate,
+                None if math.isnan(device_time) else device_time,
+                age,
+                called,
+            )
+            position += frames
+
+
+class TestRecording:
+    def test_round_trip(self, tmp_path):
+        rng = np.random.default_rng(0)
+        # Blocks of samples, each with its device time, age and callback time
+        blocks = [
+            (rng.uniform(-1.0, 1.0, (frames, 2)).astype(np.float32), *timing)
+            for frames, timing in (
+                (512, (10.0, 0.004, 1.0)),
+                (511, (10.0116, 0.003, 1.012)),
+                (3, (None, 0.0, 1.5)),
+            )
+        ]
+
+        for sample_format, tolerance in (
+            (SampleFormat.FLOAT32, 0.0),
+            (SampleFormat.INT16, 1 / 2**15),
+        ):
+            path = str(tmp_path / f"{sample_format.name}.rec")
+            recorder = Recorder(path, 8000, 2, sample_format)
+            for samples, device_time, age, called in blocks:
+                recorder.write(samples, device_time, age, recorder._started + called)
+            recorder.close()
+
+            assert Recording.is_recording(path)
+            with Recording(path) as recording:
+                assert recording.sample_rate == 8000
+                assert recording.channels == 2
+                read = [
+                    RecordedBlock(
+                        block.samples.copy(),
+                        block.time,
+                        block.device_time,
+                        block.age,
+                        block.called,
+                    )
+                    for block in recording.blocks()
+                ]
+
+            assert len(read) == len(blocks)
+            for (expected, device_time, age, called), block in zip(blocks, read):
+                assert block.samples.shape == expected.shape
+                assert np.max(np.abs(block.samples - expected)) <= tolerance
+                assert block.device_time == device_time
+                assert block.age == age
+                assert abs(block.called - called) < 1e-9
+            # Stream time is counted in frames
+            assert [block.time for block in read] == [0.0, 512 / 8000, 1023 / 8000]
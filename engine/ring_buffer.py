@@ -0,0 +1,99 @@
+"""A fixed-size sliding window of audio samples."""
+
+import numpy as np
+
+
+class RingBuffer:
+    """A preallocated ring buffer of float32 samples.
+
+    Every sample is written twice, once at the write cursor and once a full
+    capacity further along. This means the latest `capacity` samples are always
+    available as a single contiguous slice, so the window can be read without
+    copying or reordering it.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        # Twice the capacity, so the mirrored copy always fits
+        self._data = np.zeros(2 * capacity, dtype=np.float32)
+        # Index of the next sample to be written
+        self._cursor = 0
+        # Number of valid samples, up to the capacity
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def full(self) -> bool:
+        """Whether the buffer holds a full window of samples."""
+        return self._length == self.capacity
+
+    def clear(self):
+        """Discards every sample in the buffer, without deallocating it."""
+        self._cursor = 0
+        self._length = 0
+
+    def write(self, samples: np.ndarray):
+        """Appends samples to the back of the buffer, discarding the oldest
+        samples once the buffer is full."""
+        # Anything older than a full window would be overwritten anyway
+        if len(samples) > self.capacity:
+            samples = samples[-self.capacity :]
+
+        count = len(samples)
+        # The write may need to wrap around the end of the buffer
+        first = min(count, self.capacity - self._cursor)
+        second = count - first
+
+        start = self._cursor
+        self._data[start : start + first] = samples[:first]
+        self._data[start + self.capacity : start + self.capacity + first] = samples[
+            :first
+        ]
+        if second > 0:
+            self._data[:second] = samples[first:]
+            self._data[self.capacity : self.capacity + second] = samples[first:]
+
+        self._cursor = (self._cursor + count) % self.capacity
+        self._length = min(self._length + count, self.capacity)
+
+    def view(self) -> np.ndarray:
+        """Returns the buffered samples, oldest first, as a read-only view.
+
+        The view is only valid until the next write.
+        """
+        end = self._cursor + self.capacity
+        window = self._data[end - self._length : end]
+        window.flags.writeable = False
+        return window
+
+
+class TestRingBuffer:
+    def test_fill(self):
+        buffer = RingBuffer(4)
+        buffer.write(np.array([1, 2, 3], dtype=np.float32))
+        assert not buffer.full
+        assert list(buffer.view()) == [1, 2, 3]
+
+        buffer.write(np.array([4], dtype=np.float32))
+        assert buffer.full
+        assert list(buffer.view()) == [1, 2, 3, 4]
+
+    def test_wrap(self):
+        buffer = RingBuffer(4)
+        buffer.write(np.array([1, 2, 3], dtype=np.float32))
+        buffer.write(np.array([4, 5, 6], dtype=np.float32))
+        assert list(buffer.view()) == [3, 4, 5, 6]
+
+        # Larger than the buffer itself
+        buffer.write(np.arange(10, dtype=np.float32))
+        assert list(buffer.view()) == [6, 7, 8, 9]
+
+    def test_clear(self):
+        buffer = RingBuffer(4)
+        buffer.write(np.array([1, 2, 3, 4, 5], dtype=np.float32))
+        buffer.clear()
+        assert len(buffer) == 0
+        buffer.write(np.array([6], dtype=np.float32))
+        assert list(buffer.view()) == [6]
@@ -1,23 +1,96 @@
-from pyaudio import PyAudio, paContinue, paFloat32, Stream
-from pyglet.event import EventDispatcher
-from pyglet import clock
+from dataclasses import dataclass, field, replace
+from threading import Event, Lock, RLock, Thread
+from time import perf_counter
+from typing import TYPE_CHECKING
 
 import numpy as np
-import scipy as sp
 
-from .note import frequency_to_offset
+from .debouncer import Debouncer
+from .decimator import Decimator
+from .devices import Device, DeviceRegistry
+from .instrument import Instrument
+from .latency import LatencyTracker, Stage, Timestamps
+from .mailbox import Mailbox
+from .noise_gate import NoiseGate
+from .note import offset_to_frequency
+from .observer import Observable, Scheduler
+from .onset import OnsetDetector
+from .pitch_detector import Detector, PitchDetector
+from .recording import Recorder, SampleFormat
+from .ring_buffer import RingBuffer
+from .sources import AudioSource, PyAudioSource
+from .stream import EventKind, EventStream, Overflow, PitchEvent
 
+# PyAudio is only imported once a device is actually needed, so that the
+# engine can analyse audio offline without an audio stack.
+if TYPE_CHECKING:
+    from pyaudio import PyAudio
 
-def interpolated_peak(alpha, beta, gamma):
-    """Quadratic interpolation of the peak of a parabola.
 
-    This is used by the peak detection of the pitch tracker to ensure we get a
-    precise enough reading.
+@dataclass
+class Counters:
+    """Running totals of the work done by the pitch tracker.
+
+    Every full window received by the callback is either analysed or skipped,
+    so if analysis can't keep up the skipped count grows, rather than the
+    callback falling behind.
     """
-    return 0.5 * (alpha - gamma) / (alpha - 2 * beta + gamma)
 
+    # Audio callbacks received
+    callbacks: int = 0
+    # Windows analysed by the analysis thread
+    analyses: int = 0
+    # Windows dropped because a newer one arrived before they were analysed
+    skipped: int = 0
+    # Readings replaced by a newer one before the main thread picked them up
+    coalesced: int = 0
+    # Plucks detected by the callback
+    onsets: int = 0
+
+
+@dataclass
+class Channel:
+    """Everything the pitch tracker keeps track of for a single input channel.
+
+    The capture state is only touched by the callback, or under the lock, and
+    is rebuilt whenever the analysis is prepared. The readings and debouncing
+    are handed over to, and only touched by, the main thread.
+    """
+
+    index: int
+
+    gate: NoiseGate | None = None
+    onset: OnsetDetector | None = None
+    # The sliding window of this channel's audio
+    buffer: RingBuffer | None = None
+    # Whether a pluck was detected in the latest block
+    plucked: bool = False
+    # Whether there is enough of a note in the window to read
+    ready: bool = False
+    # Frames received since the latest onset, or since connecting
+    frames_since_onset: int = 0
 
-class SoundManager(EventDispatcher):
+    frequency: float | None = None
+    confidence: float = 0.0
+    # Last frequency dispatched to the main thread, and its confidence
+    dispatched_frequency: float | None = None
+    dispatched_confidence: float = 0.0
+
+    # Settles readings into offsets
+    debouncer: Debouncer = field(default_factory=Debouncer)
+    # Timestamps of the first reading of the last detected offset
+    offset_timestamps: Timestamps | None = None
+
+    # Latest reading and its confidence, with the stream time it was captured
+    # at and its timestamps, waiting to be picked up by the main thread
+    readings: Mailbox[tuple[float | None, float, float, Timestamps | None]] = field(
+        default_factory=lambda: Mailbox((None, 0.0, 0.0, None))
+    )
+    # Stream time of the latest onset, waiting to be picked up too
+    onsets: Mailbox[float] = field(default_factory=lambda: Mailbox(0.0))
+
+
+class SoundManager(Observable):
     """Does all the heavy lifting of detecting the fundamental frequency of the
     user's microphone input.
 
@@ -25,242 +98,1190 @@ class SoundManager(EventDispatcher):
     specific use-case. It might be helpful to make these adjustable from inside
     the application for better support on other devices.
 
+    Any number of channels can be captured at once, such as one student's
+    guitar per input of an audio interface. Each channel is gated, tracked and
+    debounced on its own, but every channel's window is analysed in a single
+    batch. Events are dispatched with the channel's index, as
+    `on_channel_frequency_change`, `on_channel_new_offset` and
+    `on_channel_onset`, and the first channel's are also dispatched without
+    it, so that anything only listening to one input needn't know about
+    channels.
 
+    Readings are made on other threads, so events are only dispatched once
+    they are delivered, by whatever `scheduler` runs the main loop. The same
+    events can also be iterated from asyncio code with `stream`.
     """
 
-    # The minimum average magnitude of each frame for it to not be discorded
-    noise_threshold: float = 0.1
-    # The size of the sliding window in seconds
-    window_size: float = 0.6
-    # The target size to pad the sliding window to, also in seconds
-    padded_size: float | None = 0.9
-    # The total number of harmonics to work with in the harmonic product
-    # spectrum
-    harmonics: int = 4
+    # The minimum time between analyses in seconds, or None to analyse on
+    # every callback. Raising this trades latency for CPU time.
+    hop: float | None = None
+    # The hops offered as settings, from the most CPU to the least
+    hops: tuple[float | None, ...] = (None, 0.025, 0.05, 0.1, 0.2)
 
-    # Last broadcasted offset
-    broadcasted_offset: int | None = None
-    # Last detected offset
-    last_offset: int | None = None
-    last_offset_counter: int = 0
+    # How many window lengths each window is analysed at. The longest resolves
+    # the lowest note on the instrument, and each shorter one only resolves
+    # notes `resolution_step` times higher than the last, but holds less of
+    # the audio from before the note was played.
+    resolutions: int = 2
+    resolution_step: float = 4.0
+    # Headroom below the instrument's lowest note, for down-tuned strings, in
+    # semitones
+    tuning_margin: int = 1
 
-    _stream: Stream | None = None
-    _buffer = bytes()
-    _buffer_length = 0
+    # Whether to restart the window on each pluck. Audio from before the
+    # latest onset is silenced before analysis, so the previous note can't
+    # drown out a new one.
+    onsets: bool = True
 
-    _frequency: float | None = None
+    # Whether to decimate the audio down to a lower sample rate before it is
+    # buffered and analysed. The rate is picked for the instrument, as low as
+    # it can go while keeping every harmonic the detector makes use of.
+    decimate: bool = True
+    # How much of the decimated spectrum is kept intact by the anti-aliasing
+    # filter, up to its Nyquist frequency
+    decimation_passband: float = 0.8
+
+    _pyaudio: "PyAudio | None" = None
+    # Where the audio is coming from, while listening
+    _source: AudioSource | None = None
+    _sample_rate: int | None = None
+    # The sample rate the audio is analysed at, after decimation
+    _analysis_rate: int | None = None
+    # Decimates each block for analysis, None if analysing at the full rate
+    _decimator: Decimator | None = None
+    _detector_type: Detector = Detector.HPS
+    _instrument: Instrument = Instrument.GUITAR
+
+    # Copy of the latest window of each channel, owned by the analysis thread
+    _snapshot: np.ndarray | None = None
+    # Full windows received since the analysis thread last took a snapshot
+    _pending_windows: int = 0
+    # Frames received since a window was last handed to the analysis thread
+    _frames_since_analysis: int = 0
+    # When the newest block handed to the analysis thread was captured, and
+    # received by the callback, in `perf_counter` seconds
+    _captured: float = 0.0
+    # Stream time the newest block handed to the analysis thread was captured
+    # at, on the device's clock
+    _stream_time: float = 0.0
+    _called: float = 0.0
+    _worker: Thread | None = None
+    _running: bool = False
+    # Whether audio is fed in on the calling thread rather than by a live
+    # source
+    _offline: bool = False
+    # Frames received since connecting, which the stream time is counted in
+    _frames_received: int = 0
+    # Latest capture time on the source's own clock, which must keep
+    # increasing for it to be trusted
+    _device_time: float = 0.0
+    # Writes every block captured to disk, while recording
+    _recorder: Recorder | None = None
+    # Every open event stream, replaced rather than changed so that it can be
+    # read from any thread
+    _streams: tuple[EventStream, ...] = ()
+    # Delivers readings once per tick of the main loop, while listening live
+    _scheduler: Scheduler | None = None
 
     def __init__(self) -> None:
-        # We need an instance of PyAudio to use it
-        self._audio = PyAudio()
+        super().__init__()
+        self.counters = Counters()
+        self.latency = LatencyTracker()
+        # One detector per resolution, from the shortest window to the longest
+        self._detectors: list[PitchDetector] = []
+        # Every input channel, there is always at least one
+        self._channels = [Channel(0)]
+
+        # Guards the PyAudio instance, which the device registry may replace
+        # from its own thread
+        self._audio_lock = RLock()
+        # The available input devices, probed in the background
+        self.devices = DeviceRegistry(self._probe_devices)
+
+        # Guards the sliding windows, which are written by the audio callback
+        # and read by the analysis thread
+        self._lock = Lock()
+        # Set whenever a new full window is waiting to be analysed
+        self._window_ready = Event()
+
+    @property
+    def _audio(self) -> "PyAudio":
+        """The PyAudio instance, created the first time a device is needed."""
+        if self._pyaudio is None:
+            from pyaudio import PyAudio
+
+            self._pyaudio = PyAudio()
+        return self._pyaudio
 
     @property
     def frequency(self) -> float | None:
-        """The last frequency detected by pitch tracker."""
-        return self._frequency
+        """The last frequency detected by pitch tracker, on the first
+        channel."""
+        return self._channels[0].frequency
+
+    @property
+    def confidence(self) -> float:
+        """How confident the pitch detector was in the last frequency, between
+        0 and 1."""
+        return self._channels[0].confidence
+
+    @property
+    def frequencies(self) -> list[float | None]:
+        """The last frequency detected on each channel."""
+        return [channel.frequency for channel in self._channels]
+
+    @property
+    def sample_rate(self) -> int | None:
+        """The sample rate being listened at, or None if not yet connected."""
+        return self._sample_rate
+
+    @property
+    def time(self) -> float:
+        """The stream time at the end of the latest block received, in
+        seconds."""
+        if self._sample_rate is None:
+            return 0.0
+        return self._frames_received / self._sample_rate
+
+    @property
+    def analysis_rate(self) -> int | None:
+        """The sample rate the audio is analysed at, or None if not yet
+        connected."""
+        return self._analysis_rate
+
+    @property
+    def recording(self) -> bool:
+        """Whether the captured audio is being recorded."""
+        return self._recorder is not None
+
+    @property
+    def channels(self) -> int:
+        """The number of channels being listened to."""
+        return len(self._channels)
+
+    @property
+    def broadcasted_offset(self) -> int | None:
+        """The last offset broadcasted for the first channel."""
+        return self._channels[0].debouncer.broadcasted
+
+    @property
+    def last_offset(self) -> int | None:
+        """The last offset detected on the first channel, settled or not."""
+        return self._channels[0].debouncer.offset
+
+    @property
+    def detector(self) -> Detector:
+        """The algorithm used to detect the user's pitch."""
+        return self._detector_type
+
+    @detector.setter
+    def detector(self, detector: Detector):
+        self._detector_type = detector
+        # Swap the detector out straight away if we are already listening
+        if self._sample_rate is not None:
+            self._prepare()
+
+    @property
+    def instrument(self) -> Instrument:
+        """The instrument being played, which sets the range of notes to
+        listen for."""
+        return self._instrument
+
+    @instrument.setter
+    def instrument(self, instrument: Instrument):
+        if instrument is self._instrument:
+            return
+        self._instrument = instrument
+        if self._sample_rate is not None:
+            self._prepare()
+
+    @property
+    def scheduler(self) -> Scheduler | None:
+        """Runs `deliver` on the main loop while listening live, such as
+        `pyglet.clock`. Without one, live readings are only delivered by
+        calling `deliver`, or by iterating a `stream`. With one, readings are
+        only ever delivered on the main loop, streams included."""
+        return self._scheduler
+
+    @scheduler.setter
+    def scheduler(self, scheduler: Scheduler | None):
+        if self._scheduler is not None:
+            self._scheduler.unschedule(self.deliver)
+        self._scheduler = scheduler
+
+        # Take over delivering from the last scheduler
+        source = self._source
+        if scheduler is not None and source is not None and source.live:
+            scheduler.schedule(self.deliver)
+
+    def _min_frequencies(self) -> list[float]:
+        """The lowest fundamental each resolution must resolve, from the
+        shortest window to the longest."""
+        lowest = offset_to_frequency(
+            self._instrument.value.lowest_pitch.offset - self.tuning_margin
+        )
+        return [
+            lowest * self.resolution_step**i
+            for i in reversed(range(self.resolutions))
+        ]
+
+    def _band(self) -> tuple[float, float]:
+        """The range of fundamentals that can be played on the instrument,
+        with headroom either side for strings tuned away from standard."""
+        instrument = self._instrument.value
+        return (
+            offset_to_frequency(instrument.lowest_pitch.offset - self.tuning_margin),
+            offset_to_frequency(instrument.highest_pitch.offset + self.tuning_margin),
+        )
+
+    def _decimation_factor(self) -> int:
+        """How many times to decimate the audio by before analysis.
+
+        The highest harmonic the detector makes use of, of the highest note on
+        the instrument, must stay within the passband of the decimated audio.
+        Only factors that divide the sample rate are used, so the analysis
+        rate is a whole number.
+        """
+        assert self._sample_rate is not None
+        if not self.decimate:
+            return 1
+
+        highest = self._band()[1] * self._detector_type.value.harmonics
+        limit = int(self._sample_rate * self.decimation_passband / (2 * highest))
+        return max(
+            factor
+            for factor in range(1, max(limit, 1) + 1)
+            if self._sample_rate % factor == 0
+        )
 
     def get_available_devices(self) -> list[str]:
-        """Returns a list of all available input device names."""
-        # 1. Get all device information
-        # 2. Filter by devices with at least 1 input channel
-        # 3. Map to just the name of each device
-        return list(
-            map(
-                lambda info: str(info["name"]),
-                filter(
-                    lambda info: int(info["maxInputChannels"]) > 0,
-                    map(
-                        self._audio.get_device_info_by_index,
-                        range(self._audio.get_device_count()),
-                    ),
-                ),
-            )
+        """Returns a list of all available input device names.
+
+        The names are read from the device cache, so this never waits on the
+        devices being probed. The first time, the devices are probed in the
+        background and the list starts out empty.
+        """
+        if not self.devices.probed.is_set():
+            self.devices.refresh()
+        return self.devices.names()
+
+    def _probe_devices(self) -> list[Device]:
+        """Probes every available input device, for the device registry."""
+        with self._audio_lock:
+            # PortAudio only looks for new devices when it is initialised,
+            # which can't happen while a stream is open
+            if (
+                not isinstance(self._source, PyAudioSource)
+                and self._pyaudio is not None
+            ):
+                self._pyaudio.terminate()
+                self._pyaudio = None
+
+            # 1. Get all device information
+            # 2. Filter by devices with at least 1 input channel
+            # 3. Convert each to a `Device`
+            return [
+                Device(
+                    name=str(info["name"]),
+                    index=int(info["index"]),
+                    sample_rate=int(info["defaultSampleRate"]),
+                    channels=int(info["maxInputChannels"]),
+                )
+                for info in map(
+                    self._audio.get_device_info_by_index,
+                    range(self._audio.get_device_count()),
+                )
+                if int(info["maxInputChannels"]) > 0
+            ]
+
+    def _is_current(self, device: Device) -> bool:
+        """Whether a cached device's index still refers to it, as PortAudio may
+        have looked for devices again since it was cached."""
+        return (
+            device.index < self._audio.get_device_count()
+            and self._audio.get_device_info_by_index(device.index)["name"]
+            == device.name
         )
 
-    def _callback(
-        self,
-        in_data: bytes | None,
-        frame_count: int,
-        _time_info,
-        _status_flags,
-    ) -> tuple[bytes | None, int]:
-        """Called by PyAudio every time there is new audio data to read.
-
-        `in_data` is the audio data being read, and the `frame_count` indicates
-        the number of frames (specified as a 32-bit float) contained within.
-        This is important as `in_data` is just bytes, so without knowing the
-        datatype being used it is useless.
+    def _receive(self, samples: np.ndarray, device_time: float | None, age: float):
+        """Called by the audio source every time there is new audio to read.
+
+        `samples` is a block of float32 samples, with a column per channel.
+        `device_time` is when the block was captured on the source's own
+        clock, if it has one, and `age` is how many seconds ago that was.
         """
 
-        # This is the length we are aiming for in our sliding window
-        target_length = int(self._sample_rate * self.window_size)
-
-        # Checks we have actually been passed data
-        if in_data is not None:
-            # Convert from bytes to a numpy array
-            window = np.frombuffer(in_data, dtype=np.float32)
-            # If silent...
-            if np.mean(np.abs(window)) < self.noise_threshold:
-                # ...reset the buffer...
-                self._buffer = bytes()
-                self._buffer_length = 0
-                self._frequency = None
+        self.counters.callbacks += 1
+
+        # Stream time is counted in frames, as some host APIs never start the
+        # device's clock, which would stop the debouncing from ever settling
+        assert self._sample_rate is not None
+        time = self._frames_received / self._sample_rate
+        self._frames_received += len(samples)
+
+        # The device's clock only times the latency, and only while it is
+        # actually running
+        called = perf_counter()
+        if device_time is not None and device_time > self._device_time:
+            self._device_time = device_time
+            captured = called - age
+        else:
+            captured = called
+
+        # The recorder only keeps hold of the block, it is written out on
+        # its own thread
+        recorder = self._recorder
+        if recorder is not None:
+            recorder.write(samples, device_time, age, called)
+
+        # The gates and onset detectors are only ever touched by the
+        # callback
+        for channel in self._channels:
+            assert channel.gate is not None
+            assert channel.onset is not None
+            block = samples[:, channel.index]
+            is_open = channel.gate.process(block)
+            # The onset detector must see every block, even if we ignore it
+            channel.plucked = channel.onset.process(block) and is_open and self.onsets
+
+        # The callback only ever buffers audio, analysis is left to the
+        # analysis thread so that a slow analysis can't hold up capture.
+        with self._lock:
+            assert self._sample_rate is not None
+
+            # Only the audio to be analysed is decimated, the gates and
+            # onset detectors work at the full rate
+            if self._decimator is not None:
+                analysed = self._decimator.process(samples)
             else:
-                # ...otherwise, append to the buffer.
-                self._buffer += in_data
-                self._buffer_length += frame_count
-
-        if self._buffer_length >= target_length:
-            # We use a sliding window here, so we discord any extra audio data
-            # from the front of the array. Newest data is appended to the back.
-            # This way we get fast updates and keep using the latest data we
-            # have received.
-            self._buffer = self._buffer[-target_length * 4 :]
-            self._buffer_length = target_length
-
-            # Only read the frequency if the buffer is full.
-            self._read_frequency(self._buffer)
-
-        # We schedule this event instead of calling it directly as the callback
-        # is running on a separate thread to our UI, so we need to make sure we
-        # don't crash OpenGL by attempting to make graphics calls from another
-        # thread.
-        # Scheduling works here because it pushes the function call to a stack
-        # on the main thread, where it is run later once the event loop is at
-        # rest (usually about once per frame).
-        clock.schedule_once(
-            lambda _: self.dispatch_event(
-                "on_frequency_change",
-                self.frequency,
-            ),
-            0.0,
-        )
+                analysed = samples.T
 
-        # Tell PyAudio to continue reading data.
-        return (None, paContinue)
+            # Whether any channel is open, and whether any has enough of
+            # its note to read
+            listening = False
+            ready = False
+            for channel in self._channels:
+                assert channel.gate is not None
+                assert channel.buffer is not None
 
-    def _read_frequency(self, block: bytes):
-        """Converts some block of memory to a usable frequency."""
+                # We use a sliding window here, so once the buffer is full
+                # the oldest audio data is overwritten by the newest. This
+                # way we get fast updates and keep using the latest data we
+                # have received.
+                # Silence is still buffered rather than wiping the window,
+                # so a note that dips under the gate doesn't have to refill
+                # it.
+                channel.buffer.write(analysed[channel.index])
 
-        # Read into numpy array
-        window = np.frombuffer(block, dtype=np.float32)
+                # Re-anchor the window on the block the pluck landed in
+                if channel.plucked:
+                    channel.frames_since_onset = 0
+                    self.counters.onsets += 1
+                    channel.onsets.post(time)
+                channel.frames_since_onset += analysed.shape[1]
 
-        # Hamming Window
-        signal = np.hamming(len(window)) * window
+                # If silent, there is no frequency to read...
+                if not channel.gate.is_open:
+                    channel.ready = False
+                    channel.frequency = None
+                    channel.readings.post((None, 0.0, time, None))
+                    continue
+                listening = True
 
-        # Zero Padding
-        if self.padded_size is not None:
-            signal = np.pad(
-                signal,
-                [(0, int(self.padded_size * self._sample_rate) - len(signal))],
-                mode="constant",
+                # ...otherwise, only read the frequency once the shortest
+                # window is half full of audio since the latest onset
+                channel.ready = (
+                    channel.frames_since_onset >= self._detectors[0].window_length // 2
+                )
+                ready = ready or channel.ready
+
+            self._frames_since_analysis += len(samples)
+            hop_frames = (
+                int(self.hop * self._sample_rate) if self.hop is not None else 0
             )
 
-        # Take Magnitude of Fourier Transform
-        signal = np.fft.fft(signal)
-        signal = np.abs(signal)
+            # Every channel is read together, at most once per hop
+            if ready and self._frames_since_analysis >= hop_frames:
+                self._frames_since_analysis = 0
+                self._pending_windows += 1
+                self._captured = captured
+                self._stream_time = time
+                self._called = called
+                self._window_ready.set()
+            elif not listening:
+                self._pending_windows = 0
 
-        # Generate harmonic spectra
-        spectra = [
-            sp.signal.resample(signal, len(signal) // n)
-            for n in range(1, self.harmonics + 1)
-        ]
+        # Offline, the window is analysed, and its reading delivered, on this
+        # thread straight away
+        if self._offline:
+            self._analyse_latest()
+            self.deliver()
+
+    def _analyse(self):
+        """The analysis thread's main loop.
 
-        # Crop to the lowest spectrum size
-        target_length = min(map(len, spectra))
-        cropped_spectra = np.array(list(map(lambda s: s[:target_length], spectra)))
+        Waits for a full window, then reads its frequency. Only the latest
+        window is ever analysed, any that arrived while the previous analysis
+        was running are counted as skipped.
+        """
+        while True:
+            self._window_ready.wait()
+            if not self._running:
+                return
 
-        # Take HPS
-        hps = np.prod(cropped_spectra, axis=0)
+            self._analyse_latest()
 
-        # Crop start (Disabled)
-        ignore = 0
-        peak = np.argmax(hps[ignore : len(hps) // 2]) + ignore
+    def _analyse_latest(self):
+        """Reads the frequency of the latest full window of each channel, if
+        there is one."""
+        with self._lock:
+            self._window_ready.clear()
+            # The window may have been cleared by silence since it was
+            # signalled
+            if self._pending_windows == 0:
+                return
+            self.counters.skipped += self._pending_windows - 1
+            self._pending_windows = 0
 
-        # Quadratic Interpolation
-        alpha = signal[peak - 1]
-        beta = signal[peak]
-        gamma = signal[peak + 1]
-        peak += interpolated_peak(alpha, beta, gamma)
+            assert self._snapshot is not None
+            for channel in self._channels:
+                assert channel.buffer is not None
+                # Only the audio since the latest onset is kept, anything older
+                # is left as silence, as is any of the window not yet filled
+                snapshot = self._snapshot[channel.index]
+                length = min(len(channel.buffer), channel.frames_since_onset)
+                start = len(snapshot) - length
+                snapshot[:start] = 0.0
+                np.copyto(snapshot[start:], channel.buffer.view()[-length:])
 
-        # Bin -> Frequency Conversion
-        bin_size = self._sample_rate / len(signal)
-        frequency = peak * bin_size
+            # Only the channels that were ready take the new reading
+            ready = [channel.ready for channel in self._channels]
+            timestamps = Timestamps(self._captured, self._called)
+            stream_time = self._stream_time
 
-        # Anything below 20Hz is probably background noise
-        if frequency > 20.0:
-            self._frequency = float(frequency)
-        else:
-            self._frequency = None
+        timestamps.started = perf_counter()
+        readings = self._read_frequencies(self._snapshot)
+        timestamps.finished = perf_counter()
 
-    def connect(self, device_name: str):
+        for channel, (frequency, confidence) in zip(self._channels, readings):
+            if not ready[channel.index]:
+                continue
+            channel.frequency, channel.confidence = frequency, confidence
+            # Each channel's reading is delivered, and timed, on its own
+            channel.readings.post(
+                (frequency, confidence, stream_time, replace(timestamps))
+            )
+        self.counters.analyses += 1
+
+    def _start_worker(self):
+        """Starts the analysis thread."""
+        self._running = True
+        self._worker = Thread(
+            target=self._analyse,
+            name="SoundManager analysis",
+            daemon=True,
+        )
+        self._worker.start()
+
+    def _stop_worker(self):
+        """Stops the analysis thread, waiting for any analysis in progress to
+        finish."""
+        if self._worker is None:
+            return
+
+        self._running = False
+        self._window_ready.set()
+        self._worker.join()
+        self._worker = None
+        self._window_ready.clear()
+
+    def _read_frequencies(
+        self, windows: np.ndarray
+    ) -> list[tuple[float | None, float]]:
+        """Converts a window of samples from each channel to a usable
+        frequency, alongside its confidence.
+
+        The end of each window is analysed at each resolution in turn, shortest
+        first. A short window reacts to a new note sooner, but can only be
+        trusted if its reading is within its range and it is confident, so
+        otherwise we fall back on a longer one.
+        """
+        readings: list[tuple[float | None, float]] = [(None, 0.0)] * len(windows)
+        # Channels without a reading that can be trusted yet
+        untrusted = list(range(len(windows)))
+        for detector in self._detectors:
+            # The channels still without a trusted reading are analysed in one
+            # batch, which costs far less per channel than one at a time
+            start = windows.shape[1] - detector.window_length
+            if len(untrusted) == len(windows):
+                batch = detector.detect_channels(windows[:, start:])
+            else:
+                batch = detector.detect_channels(windows[untrusted, start:])
+            for index, reading in zip(untrusted, batch):
+                readings[index] = reading
+
+            untrusted = [
+                index
+                for index in untrusted
+                if not self._is_trusted(detector, *readings[index])
+            ]
+            if len(untrusted) == 0:
+                break
+
+        # If none of the shorter windows could be trusted, the longest has the
+        # final say
+        return readings
+
+    @staticmethod
+    def _is_trusted(
+        detector: PitchDetector, frequency: float | None, confidence: float
+    ) -> bool:
+        """Whether a reading is within the detector's range, and confident."""
+        return (
+            frequency is not None
+            and frequency >= detector.min_frequency
+            and confidence >= detector.trusted_confidence
+        )
+
+    def _prepare(self):
+        """Builds the pitch detector and sliding window for the current sample
+        rate, restarting the analysis thread around them.
+
+        Everything the analysis needs is built up front, so the callback never
+        has to. The detectors are only rebuilt if the algorithm, instrument,
+        sample rate or number of channels have changed.
+        """
+        assert self._sample_rate is not None
+
+        self._stop_worker()
+
+        with self._lock:
+            min_frequencies = self._min_frequencies()
+            channels = len(self._channels)
+            # Every resolution searches the whole instrument, a shorter window
+            # must still see a low note to know not to trust itself
+            band = self._band()
+
+            # Everything past the gates and onset detectors runs at the
+            # analysis rate
+            factor = self._decimation_factor()
+            self._analysis_rate = self._sample_rate // factor
+            if factor > 1:
+                self._decimator = Decimator(factor, channels, self.decimation_passband)
+            else:
+                self._decimator = None
+
+            if [
+                (
+                    type(detector),
+                    detector.sample_rate,
+                    detector.min_frequency,
+                    detector.channels,
+                    detector.band,
+                )
+                for detector in self._detectors
+            ] != [
+                (
+                    self._detector_type.value,
+                    self._analysis_rate,
+                    min_frequency,
+                    channels,
+                    band,
+                )
+                for min_frequency in min_frequencies
+            ]:
+                self._detectors = [
+                    self._detector_type.value(
+                        self._analysis_rate, min_frequency, channels, band
+                    )
+                    for min_frequency in min_frequencies
+                ]
+
+            # Each buffer holds the longest window, the shorter ones are read
+            # from its end
+            window_length = self._detectors[-1].window_length
+            detector = self._detectors[-1]
+            for channel in self._channels:
+                # Each detector is as steady as it is, so needs its own
+                # debouncing
+                channel.debouncer.hold = detector.hold
+                channel.debouncer.tolerance = detector.tolerance
+                channel.debouncer.hysteresis = detector.hysteresis
+                channel.gate = NoiseGate(self._sample_rate)
+                channel.onset = OnsetDetector(self._sample_rate)
+                channel.buffer = RingBuffer(window_length)
+                channel.plucked = False
+                channel.ready = False
+                channel.frames_since_onset = 0
+                channel.frequency = None
+            self._snapshot = np.zeros((channels, window_length), dtype=np.float32)
+            self._pending_windows = 0
+            self._frames_since_analysis = 0
+
+        # Offline, analysis is run by `feed` instead
+        if not self._offline:
+            self._start_worker()
+
+    def connect(self, device_name: str, channels: int = 1):
         """Connects to an audio device by its name and starts listening for
-        fundamentals."""
+        fundamentals, on the first `channels` of its inputs.
 
+        The device is looked up in the device cache, which is only probed
+        again if the device isn't there or has moved.
+        """
         # Clear existing connection
-        self.bytes = bytes()
-        if self._stream is not None:
-            self._stream.close()
-            self._stream = None
-
-        # Get all devices matching passed name
-        devices = list(
-            filter(
-                lambda info: info["name"] == device_name,
-                map(
-                    self._audio.get_device_info_by_index,
-                    range(self._audio.get_device_count()),
-                ),
-            )
+        self._close_source()
+
+        # The devices can't be probed again until the stream is open, so the
+        # device found is still the one opened
+        with self._audio_lock:
+            device = self.devices.get(device_name)
+            # The device may have only just been plugged in, or PortAudio may
+            # have looked for devices again since it was cached
+            if device is None or not self._is_current(device):
+                self.devices.refresh(wait=True)
+                device = self.devices.get(device_name)
+            if device is None:
+                raise ValueError(f"Device {device_name} not found")
+
+            if device.channels < channels:
+                raise ValueError(
+                    f"Device {device_name} only has {device.channels} input "
+                    f"channels"
+                )
+
+            self.listen(PyAudioSource(self._audio, device, channels))
+
+    def listen(self, source: AudioSource):
+        """Starts listening for fundamentals on every channel of a source.
+
+        A live source is listened to in the background, exactly like a device,
+        and this returns straight away. Any other source is read through as
+        fast as it will go on the calling thread, with every block passing
+        through `feed`, and has been closed by the time this returns.
+        """
+        if not source.live:
+            self.connect_offline(source.sample_rate, source.channels)
+            self._source = source
+            try:
+                source.start(self._receive)
+            finally:
+                self._close_source()
+                self._close_streams()
+            return
+
+        self._close_source()
+        self._offline = False
+        self._frames_received = 0
+        self._device_time = 0.0
+
+        self._sample_rate = source.sample_rate
+        self._channels = [Channel(index) for index in range(source.channels)]
+        self._prepare()
+
+        # Readings are handed over to the main thread once per frame
+        if self._scheduler is not None:
+            self._scheduler.unschedule(self.deliver)
+            self._scheduler.schedule(self.deliver)
+
+        self._source = source
+        source.start(self._receive)
+
+    def connect_offline(self, sample_rate: int, channels: int = 1):
+        """Prepares to analyse audio passed to `feed`, rather than listening to
+        an audio device.
+
+        This runs the exact same detection chain as a device would, just
+        synchronously on the calling thread, so that recordings can be analysed
+        without an audio stack.
+        """
+        # Clear existing connection
+        self._close_source()
+        if self._scheduler is not None:
+            self._scheduler.unschedule(self.deliver)
+        self._offline = True
+        self._frames_received = 0
+        self._device_time = 0.0
+
+        self._sample_rate = sample_rate
+        self._channels = [Channel(index) for index in range(channels)]
+        self._prepare()
+
+    def _close_source(self):
+        """Stops listening to the current source, along with the analysis and
+        any recording of it."""
+        source = self._source
+        if source is not None:
+            # Cleared first, so that PortAudio can look for devices again
+            # once the stream is closed
+            self._source = None
+            source.stop()
+        self._stop_worker()
+        # A recording only holds a single stream
+        self.stop_recording()
+
+    def feed(self, samples: np.ndarray):
+        """Passes a block of float32 samples through the pitch tracker, as if
+        it had just been received from an audio device.
+
+        With several channels, the block has a column of samples per channel.
+        Each block follows straight on from the last. Any analysis is run, and
+        its reading delivered, before returning.
+        """
+        assert self._offline, "feed() needs connect_offline() first"
+        assert samples.size == len(samples) * len(self._channels)
+
+        self._receive(samples.reshape(len(samples), -1), None, 0.0)
+
+    def record(self, path: str, sample_format: SampleFormat = SampleFormat.FLOAT32):
+        """Starts recording every block of audio captured to a file, to be
+        replayed later with a `FileSource`.
+
+        Any recording already in progress is stopped first.
+        """
+        assert self._sample_rate is not None, "record() needs a connection first"
+
+        self.stop_recording()
+        self._recorder = Recorder(
+            path, self._sample_rate, len(self._channels), sample_format
         )
-        if len(devices) == 0:
-            raise ValueError(f"Device {device_name} not found")
-
-        device = devices[0]
-        self._sample_rate = int(device["defaultSampleRate"])
-
-        # Open audio stream with PyAudio
-        self._stream = self._audio.open(
-            input=True,
-            input_device_index=int(device["index"]),
-            rate=self._sample_rate,
-            # Read window in chunks as consistency is better this way:
-            frames_per_buffer=2**9,  # ~512 frames per buffer
-            channels=1,
-            format=paFloat32,
-            stream_callback=self._callback,
+
+    def stop_recording(self):
+        """Stops recording, once every block captured so far is written."""
+        recorder = self._recorder
+        if recorder is None:
+            return
+        # Stop the callback handing over any more blocks first
+        self._recorder = None
+        recorder.close()
+
+    def deliver(self, _dt: float = 0.0):
+        """Hands the latest reading of each channel over to the main thread.
+
+        Readings are made on the analysis thread, but we need to make sure we
+        don't crash OpenGL by attempting to make graphics calls from another
+        thread. So instead, this is scheduled to run once per frame on the main
+        loop. Any readings made since the last frame are coalesced into the
+        latest one, and `on_frequency_change` is only dispatched if the
+        frequency has actually changed. Any onset is dispatched first, with its
+        stream time, as `on_onset`.
+
+        Every event is also put into each open `stream`.
+        """
+        for channel in self._channels:
+            count, time = channel.onsets.take()
+            if count > 0:
+                self._dispatch_channel_event("onset", channel, time)
+                self._publish(EventKind.ONSET, channel, time)
+
+            count, (frequency, confidence, time, timestamps) = channel.readings.take()
+            if count == 0:
+                continue
+            self.counters.coalesced += count - 1
+
+            if timestamps is not None:
+                timestamps.dispatched = perf_counter()
+                self.latency.record_reading(timestamps)
+
+            channel.dispatched_confidence = confidence
+            if frequency != channel.dispatched_frequency:
+                channel.dispatched_frequency = frequency
+                self._dispatch_channel_event("frequency_change", channel, frequency)
+                self._publish(EventKind.FREQUENCY, channel, time)
+
+            self._update_offset(channel, frequency, time, timestamps)
+
+    def _dispatch_channel_event(self, event: str, channel: Channel, *args):
+        """Dispatches `on_channel_<event>` with the channel's index, and for
+        the first channel `on_<event>` without it."""
+        self.dispatch_event(f"on_channel_{event}", channel.index, *args)
+        if channel.index == 0:
+            self.dispatch_event(f"on_{event}", *args)
+
+    def stream(
+        self,
+        maxsize: int = 64,
+        overflow: Overflow = Overflow.DROP_OLDEST,
+        interval: float = 1 / 60,
+    ) -> EventStream:
+        """Opens a stream of every event from now on, to be iterated with
+        `async for` instead of pushing event handlers.
+
+        The stream holds up to `maxsize` events the consumer hasn't caught up
+        with yet, beyond which the `overflow` policy decides whether to drop
+        the oldest or hold up the audio. Blocking only makes sense offline,
+        with `listen` run on another thread, e.g. through `asyncio.to_thread`,
+        as a live device won't wait.
+
+        While listening live without a `scheduler`, the stream delivers the
+        readings itself every `interval` seconds, so there doesn't need to be a
+        main loop running. With one, the scheduler's main loop delivers them
+        as usual, and the stream is iterated from any thread. The stream ends
+        once an offline source has been read through.
+        """
+        stream = EventStream(maxsize, overflow, self._deliver_live, interval)
+        self._streams += (stream,)
+        return stream
+
+    def _deliver_live(self):
+        """Delivers the readings, only if listening to a live source with no
+        scheduler. Offline, they are delivered by whatever is feeding the
+        audio, and a scheduler delivers them on its own main loop, which must
+        stay the only thread handlers are dispatched on."""
+        source = self._source
+        if source is not None and source.live and self._scheduler is None:
+            self.deliver()
+
+    def _publish(self, kind: EventKind, channel: Channel, time: float):
+        """Puts an event of a channel into every open stream."""
+        streams = self._streams
+        if len(streams) == 0:
+            return
+
+        event = PitchEvent(
+            kind,
+            channel.index,
+            time,
+            channel.dispatched_frequency,
+            channel.dispatched_confidence,
+            channel.debouncer.broadcasted,
         )
+        for stream in streams:
+            stream.put(event)
+        # Forget any the consumer has closed
+        if any(stream.closed for stream in streams):
+            self._streams = tuple(
+                stream for stream in self._streams if not stream.closed
+            )
 
-    def on_frequency_change(self, frequency: float | None):
-        # Convert frequency to pitch
-        if frequency is not None:
-            offset = frequency_to_offset(frequency)
-        else:
-            offset = None
+    def _close_streams(self):
+        """Ends every open stream, once its consumer has caught up."""
+        streams = self._streams
+        self._streams = ()
+        for stream in streams:
+            stream.close()
 
-        # Increment counter if offset is the same as last offset
-        if offset == self.last_offset:
-            self.last_offset_counter += 1
-        # Reset counter if offset is different from last offset
-        else:
-            self.last_offset = offset
-            self.last_offset_counter = 0
-
-        # Only broadcast to others if the offset has been the same for 5
-        # frames, and is different from the last *broadcasted* offset.
-        if (
-            self.last_offset_counter >= 5
-            and self.last_offset != self.broadcasted_offset
-        ):
-            self.broadcasted_offset = self.last_offset
-            self.dispatch_event("on_new_offset", self.broadcasted_offset)
+    def _update_offset(
+        self,
+        channel: Channel,
+        frequency: float | None,
+        time: float,
+        timestamps: Timestamps | None,
+    ):
+        """Debounces each new reading of a channel into an offset,
+        broadcasting it once it has settled.
+
+        The broadcast is timed from the first reading of the offset, so that
+        the latency includes the time spent settling.
+        """
+        debouncer = channel.debouncer
+        last_offset = debouncer.offset
+        broadcast = debouncer.update(frequency, time)
+        if debouncer.offset != last_offset:
+            channel.offset_timestamps = timestamps
+
+        # Only broadcast to others once the offset has held steady, and is
+        # different from the last *broadcasted* offset.
+        if broadcast:
+            self._dispatch_channel_event("new_offset", channel, debouncer.broadcasted)
+            self._publish(EventKind.OFFSET, channel, time)
+
+            # Silence isn't read from a window, so has nothing to time
+            if channel.offset_timestamps is not None:
+                broadcast = perf_counter()
+                first = channel.offset_timestamps
+                self.latency.record(Stage.DEBOUNCE, broadcast - first.dispatched)
+                self.latency.record(Stage.TOTAL, broadcast - first.captured)
 
     def __del__(self) -> None:
         # Must cleanup when deleted
-        if self._stream is not None:
-            self._stream.close()
-        self._audio.terminate()
+        self.devices.stop()
+        self._close_source()
+        if self._pyaudio is not None:
+            self._pyaudio.terminate()
 
 
 SoundManager.register_event_type("on_frequency_change")
 SoundManager.register_event_type("on_new_offset")
+SoundManager.register_event_type("on_onset")
+SoundManager.register_event_type("on_channel_frequency_change")
+SoundManager.register_event_type("on_channel_new_offset")
+SoundManager.register_event_type("on_channel_onset")
+
+
+class TestSoundManager:
+    def test_stopped_clock(self):
+        from .synth import pluck
+
+        sound_manager = SoundManager()
+        sound_manager.connect_offline(44100)
+        offsets = []
+        sound_manager.push_handlers(on_new_offset=offsets.append)
+
+        # A device whose clock never starts, with every block claiming to be
+        # as old as the stream
+        samples = pluck(220.0, 44100, decay=8.0, noise=0.01)[:, np.newaxis]
+        for start in range(0, len(samples), 512):
+            sound_manager._receive(samples[start : start + 512], 0.0, 100.0)
+
+        assert offsets == [-12]
+        assert sound_manager.time == len(samples) / 44100
+        # Nothing to time the input by
+        assert np.all(sound_manager.latency.durations(Stage.INPUT) == 0.0)
+
+    def test_replay(self, tmp_path):
+        from .sources import FileSource
+        from .synth import pluck
+
+        path = str(tmp_path / "session.rec")
+        live = SoundManager()
+        live.connect_offline(44100)
+        offsets = []
+        live.push_handlers(on_new_offset=offsets.append)
+        live.record(path)
+
+        # A device clock running alongside the audio, with each block handed
+        # over 5ms after it was captured
+        samples = pluck(220.0, 44100, decay=8.0, noise=0.01)[:, np.newaxis]
+        for start in range(0, len(samples), 512):
+            live._receive(samples[start : start + 512], 100.0 + start / 44100, 0.005)
+        live.stop_recording()
+
+        replayed = SoundManager()
+        replayed_offsets = []
+        replayed.push_handlers(on_new_offset=replayed_offsets.append)
+        replayed.listen(FileSource(path))
+
+        assert replayed_offsets == offsets == [-12]
+        assert replayed.time == live.time
+        # Timed by the recorded clock, exactly as it was live
+        durations = replayed.latency.durations(Stage.INPUT)
+        assert len(durations) > 0
+        assert np.allclose(durations, 0.005)
+        assert np.allclose(live.latency.durations(Stage.INPUT), 0.005)
+
+    def test_channels(self):
+        from .sources import SyntheticSource
+
+        sound_manager = SoundManager()
+        offsets = []
+        aliased = []
+        sound_manager.push_handlers(
+            on_channel_new_offset=lambda channel, offset: offsets.append(
+                (channel, offset)
+            ),
+            on_new_offset=aliased.append,
+        )
+        sound_manager.listen(SyntheticSource([110.0, 220.0], channels=2))
+
+        # Each channel settles on each note, and says which channel it is
+        assert offsets == [(0, -24), (1, -24), (0, -12), (1, -12)]
+        # Only the first channel is dispatched without its index
+        assert aliased == [-24, -12]
+
+    def test_partial_batch(self):
+        from .synth import pluck
+
+        sound_manager = SoundManager()
+        sound_manager.connect_offline(44100, channels=2)
+        shortest, longest = sound_manager._detectors
+        # Windows are analysed after decimation
+        sample_rate = sound_manager.analysis_rate
+        assert sample_rate is not None
+        # Low E is below what the shortest window resolves, E4 isn't, so only
+        # the first channel falls back on the longest window
+        frequencies = (82.41, 329.63)
+        windows = np.stack(
+            [
+                pluck(
+                    frequency,
+                    sample_rate,
+                    longest.window_length / sample_rate,
+                    decay=8.0,
+                )
+                for frequency in frequencies
+            ]
+        )
+        short = shortest.detect_channels(windows[:, -shortest.window_length :])
+        assert not sound_manager._is_trusted(shortest, *short[0])
+        assert sound_manager._is_trusted(shortest, *short[1])
+
+        readings = sound_manager._read_frequencies(windows)
+        for (frequency, _), expected in zip(readings, frequencies):
+            assert frequency is not None
+            assert abs(1200 * np.log2(frequency / expected)) < 10
+
+    def test_offline(self):
+        import asyncio
+
+        from .synth import pluck
+
+        sound_manager = SoundManager()
+        sound_manager.connect_offline(44100)
+        offsets = []
+        sound_manager.push_handlers(on_new_offset=offsets.append)
+        stream = sound_manager.stream(maxsize=1000)
+
+        # A2, A3 then D3, a second each, each plucked over the last
+        rng = np.random.default_rng(0)
+        samples = np.concatenate(
+            [
+                pluck(
+                    offset_to_frequency(offset), 44100, decay=8.0, noise=0.01, rng=rng
+                )
+                for offset in (-24, -12, -19)
+            ]
+        )
+        blocks = range(0, len(samples), 512)
+        for start in blocks:
+            sound_manager.feed(samples[start : start + 512])
+
+        assert offsets == [-24, -12, -19]
+        counters = sound_manager.counters
+        assert counters.callbacks == len(blocks)
+        assert 0 < counters.analyses <= counters.callbacks
+        # Offline, every window is analysed and delivered straight away
+        assert counters.skipped == 0
+        assert counters.coalesced == 0
+        # The first note is plucked from silence, before the onset detector
+        # has a frame to compare with
+        assert counters.onsets == 2
+
+        # The stream saw the same, timed by the stream
+        stream.close()
+
+        async def consume() -> list[PitchEvent]:
+            return [event async for event in stream]
+
+        events = asyncio.run(consume())
+        assert [
+            event.offset for event in events if event.kind == EventKind.OFFSET
+        ] == offsets
+        onsets = [event.time for event in events if event.kind == EventKind.ONSET]
+        assert len(onsets) == 2
+        assert abs(onsets[0] - 1.0) < 0.05 and abs(onsets[1] - 2.0) < 0.05
+        times = [event.time for event in events]
+        assert times == sorted(times)
+
+    def test_coalescing(self):
+        from .synth import pluck
+
+        class LiveSource:
+            """Hands over blocks whenever the test says, from the test's own
+            thread."""
+
+            live = True
+            sample_rate = 44100
+            channels = 1
+
+            def start(self, callback):
+                self.callback = callback
+
+            def stop(self):
+                pass
+
+        sound_manager = SoundManager()
+        frequencies = []
+        sound_manager.push_handlers(on_frequency_change=frequencies.append)
+        source = LiveSource()
+        sound_manager.listen(source)
+
+        samples = pluck(220.0, 44100, 0.5, decay=8.0, noise=0.01)[:, np.newaxis]
+        for start in range(0, len(samples), 512):
+            source.callback(samples[start : start + 512], None, 0.0)
+        # Waits for the analysis thread to finish
+        sound_manager._close_source()
+
+        # Nothing was delivered along the way, so every reading but the latest
+        # was coalesced away
+        sound_manager.deliver()
+        counters = sound_manager.counters
+        assert counters.analyses > 1
+        assert counters.coalesced == counters.analyses - 1
+        assert len(frequencies) == 1
+        assert abs(1200 * np.log2(frequencies[0] / 220.0)) < 10
+
+    def test_stream_scheduler(self):
+        import asyncio
+        from threading import Event, Thread, get_ident
+
+        from .synth import pluck
+
+        class Scheduler:
+            """Stands in for a main loop, running on a thread of its own."""
+
+            def __init__(self):
+                self.funcs = []
+
+            def schedule(self, func):
+                self.funcs.append(func)
+
+            def unschedule(self, func):
+                if func in self.funcs:
+                    self.funcs.remove(func)
+
+        class LiveSource:
+            live = True
+            sample_rate = 44100
+            channels = 1
+
+            def start(self, callback):
+                self.callback = callback
+
+            def stop(self):
+                pass
+
+        sound_manager = SoundManager()
+        # Every thread readings are delivered on
+        threads = set()
+
+        def deliver(dt: float = 0.0):
+            threads.add(get_ident())
+            SoundManager.deliver(sound_manager, dt)
+
+        sound_manager.deliver = deliver
+        scheduler = Scheduler()
+        sound_manager.scheduler = scheduler
+        source = LiveSource()
+        sound_manager.listen(source)
+        # Would deliver on the event loop's thread almost constantly, if the
+        # stream were left to deliver for itself
+        stream = sound_manager.stream(interval=0.001)
+
+        stopped = Event()
+
+        def main_loop():
+            while not stopped.wait(0.005):
+                for func in list(scheduler.funcs):
+                    func(0.005)
+
+        main = Thread(target=main_loop)
+        main.start()
+
+        samples = pluck(220.0, 44100, 0.5, decay=8.0, noise=0.01)[:, np.newaxis]
+
+        async def consume() -> PitchEvent:
+            async for event in stream:
+                if event.kind == EventKind.FREQUENCY and event.frequency is not None:
+                    return event
+            raise AssertionError("The stream ended without a reading")
+
+        async def play() -> PitchEvent:
+            # The stream is already waiting as the audio arrives
+            consumer = asyncio.ensure_future(consume())
+            for start in range(0, len(samples), 512):
+                source.callback(samples[start : start + 512], None, 0.0)
+                await asyncio.sleep(0.002)
+            return await asyncio.wait_for(consumer, 10.0)
+
+        try:
+            event = asyncio.run(play())
+        finally:
+            stopped.set()
+            main.join()
+            sound_manager._close_source()
+
+        assert event.frequency is not None
+        assert abs(1200 * np.log2(event.frequency / 220.0)) < 10
+        # Only ever delivered on the main loop
+        assert threads == {main.ident}
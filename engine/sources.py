@@ -0,0 +1,339 @@
+"""Sources of audio for the `SoundManager` to listen to.
+
+Every source hands blocks of float32 samples, with a column per channel, to a
+callback, which feeds them through the exact same buffering and detection as
+any other. A live source, like an audio device, calls back from its own thread
+as the audio arrives. Every other source is read through as fast as it will
+go, so a file or pipe can be analysed without an audio stack, and far quicker
+than real time.
+"""
+
+import mmap
+import wave
+from typing import TYPE_CHECKING, BinaryIO, Callable, Iterator, Protocol, Sequence
+
+import numpy as np
+
+from .devices import Device
+from .recording import Recording
+
+if TYPE_CHECKING:
+    from pyaudio import PyAudio, Stream
+
+
+# Matches the block size used when listening to a device
+BLOCK_SIZE = 2**9
+
+# Called with each block of samples, the time it was captured at on the
+# source's own clock (or None if it hasn't got one), and how many seconds ago
+# that was. Blocks always follow straight on from one another, the clock only
+# times the latency.
+BlockCallback = Callable[[np.ndarray, float | None, float], None]
+
+
+class AudioSource(Protocol):
+    """Somewhere to read audio from."""
+
+    sample_rate: int
+    channels: int
+    # Whether the source calls back in real time from its own thread, rather
+    # than being read through before `start` returns
+    live: bool
+
+    def start(self, callback: BlockCallback):
+        """Starts handing blocks to the callback."""
+        ...
+
+    def stop(self):
+        """Stops handing over blocks, and lets go of anything held open."""
+        ...
+
+
+class PyAudioSource:
+    """Listens to an audio device through PyAudio."""
+
+    live = True
+
+    def __init__(
+        self,
+        audio: "PyAudio",
+        device: Device,
+        channels: int = 1,
+        block_size: int = BLOCK_SIZE,
+    ):
+        self.sample_rate = device.sample_rate
+        self.channels = channels
+        self.block_size = block_size
+        self._audio = audio
+        self._device = device
+        self._stream: "Stream | None" = None
+
+    def start(self, callback: BlockCallback):
+        from pyaudio import paContinue, paFloat32
+
+        def stream_callback(
+            in_data: bytes | None,
+            _frame_count: int,
+            time_info: dict[str, float],
+            _status_flags,
+        ) -> tuple[bytes | None, int]:
+            # Checks we have actually been passed data
+            if in_data is not None:
+                # The channels are interleaved, so each one is a column
+                samples = np.frombuffer(in_data, dtype=np.float32)
+                # PortAudio times the block on its own clock
+                captured = time_info["input_buffer_adc_time"]
+                callback(
+                    samples.reshape(-1, self.channels),
+                    captured,
+                    time_info["current_time"] - captured,
+                )
+
+            # Tell PyAudio to continue reading data.
+            return (None, paContinue)
+
+        # Open audio stream with PyAudio
+        self._stream = self._audio.open(
+            input=True,
+            input_device_index=self._device.index,
+            rate=self.sample_rate,
+            # Read window in chunks as consistency is better this way
+            frames_per_buffer=self.block_size,
+            channels=self.channels,
+            format=paFloat32,
+            stream_callback=stream_callback,
+        )
+
+    def stop(self):
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+
+class WaveReader:
+    """Reads blocks of float32 samples from a PCM wave file.
+
+    The header is parsed with `wave`, but the samples themselves are read
+    through a memory map, so only the blocks being processed are ever loaded.
+    Multiple channels are mixed down to mono.
+    """
+
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+
+        with wave.open(self._file, "rb") as header:
+            self.sample_rate = header.getframerate()
+            self.channels = header.getnchannels()
+            self.sample_width = header.getsampwidth()
+            self.frames = header.getnframes()
+            # `wave` stops reading just after the header of the data chunk
+            self._offset = self._file.tell()
+
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __enter__(self) -> "WaveReader":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def _decode(self, data: memoryview) -> np.ndarray:
+        """Converts raw PCM bytes to float32 samples between -1 and 1."""
+        match self.sample_width:
+            case 1:
+                # 8-bit samples are unsigned
+                samples = np.frombuffer(data, dtype=np.uint8).astype(np.float32)
+                samples = (samples - 128.0) / 128.0
+            case 2:
+                samples = np.frombuffer(data, dtype="<i2").astype(np.float32)
+                samples /= 2.0**15
+            case 3:
+                # No 24-bit type, so shift each sample into the top of an int32
+                raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3)
+                padded = np.zeros((len(raw), 4), dtype=np.uint8)
+                padded[:, 1:] = raw
+                samples = padded.view("<i4").ravel().astype(np.float32)
+                samples /= 2.0**31
+            case 4:
+                samples = np.frombuffer(data, dtype="<i4").astype(np.float32)
+                samples /= 2.0**31
+            case _:
+                raise ValueError(f"Unsupported sample width {self.sample_width}")
+
+        # Mix down to mono
+        if self.channels > 1:
+            samples = samples.reshape(-1, self.channels).mean(axis=1)
+        return samples.astype(np.float32, copy=False)
+
+    def blocks(self, block_size: int = BLOCK_SIZE) -> Iterator[np.ndarray]:
+        """Yields the file's samples in blocks of `block_size` frames."""
+        frame_bytes = self.channels * self.sample_width
+        view = memoryview(self._map)
+        try:
+            for start in range(0, self.frames, block_size):
+                count = min(block_size, self.frames - start)
+                offset = self._offset + start * frame_bytes
+                yield self._decode(view[offset : offset + count * frame_bytes])
+        finally:
+            view.release()
+
+
+class FileSource:
+    """Reads a PCM wave file, mixed down to mono, or a recording made by
+    `SoundManager.record`, with every channel and capture time it was recorded
+    with."""
+
+    live = False
+
+    def __init__(self, path: str, block_size: int = BLOCK_SIZE):
+        self.block_size = block_size
+        if Recording.is_recording(path):
+            self._reader: Recording | WaveReader = Recording(path)
+            self.channels = self._reader.channels
+        else:
+            self._reader = WaveReader(path)
+            self.channels = 1
+        self.sample_rate = self._reader.sample_rate
+
+    def blocks(self) -> Iterator[tuple[np.ndarray, float | None, float]]:
+        """Yields each block, with the device time it was captured at and its
+        age when it was handed over, if it was recorded."""
+        if isinstance(self._reader, Recording):
+            for block in self._reader.blocks():
+                samples = block.samples
+                yield samples.reshape(len(samples), -1), block.device_time, block.age
+        else:
+            for samples in self._reader.blocks(self.block_size):
+                yield samples[:, np.newaxis], None, 0.0
+
+    def start(self, callback: BlockCallback):
+        # A recording is timed exactly as it was live, so its latency can be
+        # measured again
+        for samples, device_time, age in self.blocks():
+            callback(samples, device_time, age)
+
+    def stop(self):
+        self._reader.close()
+
+
+class PipeSource:
+    """Reads raw, interleaved float32 samples from a pipe, such as stdin,
+    until it is closed."""
+
+    live = False
+
+    def __init__(
+        self,
+        pipe: BinaryIO,
+        sample_rate: int,
+        channels: int = 1,
+        block_size: int = BLOCK_SIZE,
+    ):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.block_size = block_size
+        self._pipe = pipe
+        self._running = False
+
+    def start(self, callback: BlockCallback):
+        frame_bytes = 4 * self.channels
+        self._running = True
+        # Anything short of a whole frame is kept for the next read
+        leftover = b""
+        while self._running:
+            data = self._pipe.read(self.block_size * frame_bytes)
+            if not data:
+                return
+            data = leftover + data
+            whole = len(data) - len(data) % frame_bytes
+            leftover = data[whole:]
+            if whole == 0:
+                continue
+
+            samples = np.frombuffer(data, dtype=np.float32, count=whole // 4)
+            callback(samples.reshape(-1, self.channels), None, 0.0)
+
+    def stop(self):
+        self._running = False
+
+
+class SyntheticSource:
+    """Plays a plucked note at each frequency in turn, with a column of the
+    same notes for every channel."""
+
+    live = False
+
+    def __init__(
+        self,
+        frequencies: Sequence[float],
+        sample_rate: int = 44100,
+        channels: int = 1,
+        duration: float = 1.0,
+        noise: float = 0.01,
+        block_size: int = BLOCK_SIZE,
+        seed: int = 0,
+    ):
+        self.frequencies = frequencies
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.duration = duration
+        self.noise = noise
+        self.block_size = block_size
+        self.seed = seed
+        self._running = False
+
+    def start(self, callback: BlockCallback):
+        # Only synthesised on demand, as importing NumPy's random number
+        # generators slows down importing the engine
+        from .synth import pluck
+
+        rng = np.random.default_rng(self.seed)
+        self._running = True
+        for frequency in self.frequencies:
+            note = pluck(
+                frequency,
+                self.sample_rate,
+                self.duration,
+                decay=8.0,
+                noise=self.noise,
+                rng=rng,
+            )
+            samples = np.repeat(note[:, np.newaxis], self.channels, axis=1)
+            for start in range(0, len(samples), self.block_size):
+                if not self._running:
+                    return
+                callback(samples[start : start + self.block_size], None, 0.0)
+
+    def stop(self):
+        self._running = False
+
+
+class TestSources:
+    def test_pipe(self):
+        import io
+
+        rng = np.random.default_rng(0)
+        samples = rng.uniform(-1.0, 1.0, (1000, 2)).astype(np.float32)
+        source = PipeSource(io.BytesIO(samples.tobytes()), 8000, 2, block_size=300)
+
+        blocks = []
+        source.start(lambda block, time, _age: blocks.append(block))
+        assert [len(block) for block in blocks] == [300, 300, 300, 100]
+        assert np.array_equal(np.concatenate(blocks), samples)
+
+    def test_synthetic(self):
+        source = SyntheticSource([110.0, 220.0], 8000, channels=2, duration=0.5)
+        frames = 0
+
+        def callback(block: np.ndarray, time: float | None, _age: float):
+            nonlocal frames
+            assert block.shape[1] == 2
+            assert time is None
+            frames += len(block)
+
+        source.start(callback)
+        assert frames == 8000
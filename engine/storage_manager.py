@@ -6,6 +6,7 @@ from copy import deepcopy
 from .instrument import Instrument
 from .progress import Progress
 from .note import Note
+from .pitch_detector import Detector
 
 
 class Config(TypedDict):
@@ -14,12 +15,16 @@ class Config(TypedDict):
     input_device: str | None
     tuner_accidentals: str
     default_instrument: str
+    analysis_hop: float | None
+    pitch_detector: str
 
 
 DEFAULT_CONFIG: Config = {
     "input_device": None,
     "tuner_accidentals": Note.Mode.SHARPS.name,
     "default_instrument": Instrument.GUITAR.name,
+    "analysis_hop": None,
+    "pitch_detector": Detector.HPS.name,
 }
 
 
@@ -205,3 +210,32 @@ class StorageManager:
         config = self._load_config()
         config["default_instrument"] = default_instrument.name
         self._save_config(config)
+
+    @property
+    def analysis_hop(self) -> float | None:
+        """The minimum time between pitch analyses in seconds, or None to
+        analyse as often as possible."""
+        config = self._load_config()
+        hop = config.get("analysis_hop", None)
+        if isinstance(hop, (int, float)):
+            return float(hop)
+
+        return None
+
+    @analysis_hop.setter
+    def analysis_hop(self, analysis_hop: float | None):
+        config = self._load_config()
+        config["analysis_hop"] = analysis_hop
+        self._save_config(config)
+
+    @property
+    def pitch_detector(self) -> Detector:
+        """The algorithm used to detect the user's pitch."""
+        config = self._load_config()
+        return Detector[config.get("pitch_detector", Detector.HPS.name)]
+
+    @pitch_detector.setter
+    def pitch_detector(self, pitch_detector: Detector):
+        config = self._load_config()
+        config["pitch_detector"] = pitch_detector.name
+        self._save_config(config)
@@ -0,0 +1,241 @@
+"""Hands the pitch tracker's events to asyncio code, for tools and services
+that don't run a pyglet window."""
+
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum, auto
+from threading import Condition, get_ident
+from typing import TYPE_CHECKING, Callable
+
+# asyncio is only imported once a stream is iterated, as it takes a noticeable
+# time to import, and most of the engine's users never need it
+if TYPE_CHECKING:
+    import asyncio
+
+
+class EventKind(Enum):
+    """What happened to a channel."""
+
+    # The channel's frequency reading changed
+    FREQUENCY = auto()
+    # The channel settled on a new offset, or on silence
+    OFFSET = auto()
+    # The channel was plucked
+    ONSET = auto()
+
+
+@dataclass(frozen=True)
+class PitchEvent:
+    """Something that happened to a channel, alongside everything known about
+    the channel at the time."""
+
+    kind: EventKind
+    channel: int
+    # Stream time of the audio the event was read from, in seconds
+    time: float
+    # Latest frequency reading, None for silence
+    frequency: float | None
+    confidence: float
+    # Last offset broadcast, None for silence
+    offset: int | None
+
+
+class Overflow(Enum):
+    """What an `EventStream` does with a new event once it is full."""
+
+    # Throw away the oldest event waiting, so the consumer only ever falls
+    # behind by the size of the stream
+    DROP_OLDEST = auto()
+    # Wait for the consumer to catch up, holding up whatever is reading the
+    # audio. Offline, this slows the source down to the consumer's pace.
+    BLOCK = auto()
+
+
+class EventStream:
+    """A bounded queue of `PitchEvent`s, iterated with `async for`.
+
+    Events are put into the stream on whichever thread the sound manager
+    delivers readings on, and taken out on the event loop that iterates it.
+    Iterating ends once the stream is closed and every event put into it has
+    been taken. Closing it from inside an `async with` block, or by calling
+    `close`, stops the sound manager putting any more into it.
+
+    A live sound manager without a scheduler has its readings delivered by the
+    stream itself, every `interval` seconds while it waits for an event, so the
+    event loop must run on the thread that would otherwise deliver them. With a
+    scheduler, its main loop delivers them instead. Nothing is ever blocked
+    on that thread, as nothing would be left to take the events out, so the
+    stream can briefly hold more than `maxsize` events.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 64,
+        overflow: Overflow = Overflow.DROP_OLDEST,
+        deliver: Callable[[], None] | None = None,
+        interval: float = 1 / 60,
+    ):
+        assert maxsize > 0
+        self.maxsize = maxsize
+        self.overflow = overflow
+        # Events thrown away by the drop oldest policy
+        self.dropped = 0
+
+        # Delivers the sound manager's readings, if they aren't already
+        self._deliver = deliver
+        self._interval = interval
+
+        # Guards the queue, and wakes a blocked producer once there is room
+        self._condition = Condition()
+        self._events: deque[PitchEvent] = deque()
+        self._closed = False
+
+        # The event loop iterating the stream, and its thread, once known
+        self._loop: "asyncio.AbstractEventLoop | None" = None
+        self._thread: int | None = None
+        # Set by the producer whenever it puts an event in, or closes, once
+        # the event loop is known
+        self._wake: "asyncio.Event | None" = None
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def __len__(self) -> int:
+        with self._condition:
+            return len(self._events)
+
+    def put(self, event: PitchEvent):
+        """Adds an event to the stream, following the overflow policy if it is
+        full. Does nothing once the stream is closed."""
+        with self._condition:
+            if self.overflow == Overflow.BLOCK and get_ident() != self._thread:
+                while len(self._events) >= self.maxsize and not self._closed:
+                    self._condition.wait()
+            if self._closed:
+                return
+
+            if (
+                self.overflow == Overflow.DROP_OLDEST
+                and len(self._events) >= self.maxsize
+            ):
+                self._events.popleft()
+                self.dropped += 1
+            self._events.append(event)
+        self._notify()
+
+    def close(self):
+        """Stops any more events being put into the stream, releasing any
+        producer waiting for room. The events already in it are still
+        iterated."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._notify()
+
+    def _notify(self):
+        """Wakes the consumer, from any thread."""
+        loop = self._loop
+        if loop is None or self._wake is None:
+            # The consumer checks the queue before it first waits
+            return
+        try:
+            loop.call_soon_threadsafe(self._wake.set)
+        except RuntimeError:
+            # The event loop has already closed
+            pass
+
+    def _take(self) -> PitchEvent | None:
+        """Takes the oldest event out of the stream, if there is one."""
+        with self._condition:
+            if len(self._events) == 0:
+                return None
+            event = self._events.popleft()
+            self._condition.notify_all()
+            return event
+
+    def __aiter__(self) -> "EventStream":
+        return self
+
+    async def __anext__(self) -> PitchEvent:
+        import asyncio
+
+        if self._wake is None:
+            self._wake = asyncio.Event()
+            self._thread = get_ident()
+            self._loop = asyncio.get_running_loop()
+
+        while True:
+            # Cleared before checking, so a put in between still wakes us
+            self._wake.clear()
+            event = self._take()
+            if event is not None:
+                return event
+            if self._closed:
+                raise StopAsyncIteration
+
+            if self._deliver is None:
+                await self._wake.wait()
+                continue
+            try:
+                await asyncio.wait_for(self._wake.wait(), self._interval)
+            except TimeoutError:
+                self._deliver()
+
+    async def __aenter__(self) -> "EventStream":
+        return self
+
+    async def __aexit__(self, *_exc_info):
+        self.close()
+        with self._condition:
+            self._events.clear()
+
+
+class TestEventStream:
+    @staticmethod
+    def event(time: float) -> PitchEvent:
+        return PitchEvent(EventKind.FREQUENCY, 0, time, 440.0, 1.0, 0)
+
+    def test_drop_oldest(self):
+        import asyncio
+
+        stream = EventStream(maxsize=2)
+        for time in range(5):
+            stream.put(self.event(time))
+        stream.close()
+        # Ignored once closed
+        stream.put(self.event(5))
+        assert stream.dropped == 3
+
+        async def consume() -> list[float]:
+            return [event.time async for event in stream]
+
+        assert asyncio.run(consume()) == [3, 4]
+
+    def test_block(self):
+        import asyncio
+        from threading import Thread
+
+        stream = EventStream(maxsize=2, overflow=Overflow.BLOCK)
+
+        def produce():
+            for time in range(50):
+                stream.put(self.event(time))
+            stream.close()
+
+        async def consume() -> list[float]:
+            times = []
+            async for event in stream:
+                # Never more than the stream holds, however slow we are
+                assert len(stream) <= 2
+                times.append(event.time)
+                await asyncio.sleep(0)
+            return times
+
+        producer = Thread(target=produce)
+        producer.start()
+        times = asyncio.run(consume())
+        producer.join()
+        # Held up rather than thrown away
+        assert times == list(range(50))
+        assert stream.dropped == 0
@@ -13,6 +13,8 @@ from .fretboard import Fretboard
 from .fretboard_explorer import FretboardExplorer
 from .stave import Stave
 from .lesson import Lessons
+from .latency_overlay import LatencyOverlay
+from .sound_events import attach_sound_manager
 
 
 __all__ = [
@@ -29,4 +31,6 @@ __all__ = [
     "FretboardExplorer",
     "Stave",
     "Lessons",
+    "LatencyOverlay",
+    "attach_sound_manager",
 ]
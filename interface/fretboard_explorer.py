@@ -34,6 +34,8 @@ class FretboardExplorer(BorderedRectangle):
         )
 
         sound_manager.push_handlers(self)
+        self.sound_manager = sound_manager
+        self.sound_manager.instrument = storage_manager.default_instrument
         self.storage_manager = storage_manager
 
         self.dropdown = Dropdown(
@@ -106,8 +108,10 @@ Blue - Octave""",
         match option:
             case Instrument.GUITAR.value.name:
                 self.construct_fretboard(Instrument.GUITAR.value.strings)
+                self.sound_manager.instrument = Instrument.GUITAR
             case Instrument.BASS.value.name:
                 self.construct_fretboard(Instrument.BASS.value.strings)
+                self.sound_manager.instrument = Instrument.BASS
 
     def on_new_offset(self, offset: int | None):
         """Called when the pitch detector has confirmed that a note is being
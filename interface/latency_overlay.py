@@ -0,0 +1,57 @@
+from pyglet import clock
+
+from framework import Frame, Size, Position, Pin, Vec2, Mat2
+from framework.components import Text
+
+from engine import SoundManager
+
+from interface import BorderedRectangle
+from interface.style import Colours, Sizing
+
+
+class LatencyOverlay(BorderedRectangle):
+    """A debug overlay showing how long each stage of the pitch tracker takes,
+    from the audio being captured to an offset being broadcast.
+
+    Must be closed before being discarded, as it refreshes itself on a timer.
+    """
+
+    # Seconds between each refresh of the figures
+    interval: float = 0.5
+
+    def __init__(self, sound_manager: SoundManager, parent: Frame | None):
+        super().__init__(
+            size=Size(constant=Vec2(440.0, 150.0)),
+            position=Position(
+                pin=Pin.bottom_left(),
+                offset=Vec2(1.0, 1.0) * Sizing.CONTENT_PADDING,
+            ),
+            parent=parent,
+        )
+        self.sound_manager = sound_manager
+
+        self.table = Text(
+            "",
+            colour=Colours.FOREGROUND,
+            size=Size(
+                matrix=Mat2(),
+                constant=-Vec2(1.0, 1.0) * 2 * Sizing.PADDING,
+            ),
+            position=Position(
+                pin=Pin.top_left(),
+                offset=Vec2(Sizing.PADDING, -Sizing.PADDING),
+            ),
+            parent=self,
+            font_size=10,
+        )
+
+        self.refresh()
+        clock.schedule_interval(self.refresh, self.interval)
+
+    def refresh(self, _dt: float = 0.0):
+        """Updates the table with the latest percentiles."""
+        self.table.text = self.sound_manager.latency.report()
+
+    def close(self):
+        """Stops refreshing the overlay."""
+        clock.unschedule(self.refresh)
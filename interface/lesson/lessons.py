@@ -61,6 +61,8 @@ class Lessons(Frame):
 
     def show(self):
         """Displays the current view by constructing the content."""
+        # Listen for the range of notes on the selected instrument
+        self.sound.instrument = self.instrument
         match self.current_mode:
             case self.Mode.SELECTION:
                 self.content = LessonSelection(
@@ -107,6 +109,7 @@ class Lessons(Frame):
     def on_instrument_change(self, instrument: Instrument):
         """Called when a new instrument is selected."""
         self.instrument = instrument
+        self.sound.instrument = instrument
 
     def on_lesson_started(self, lesson: Lesson, complete: bool):
         """Called when lesson selection reports that a lesson was chosen."""
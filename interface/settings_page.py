@@ -7,7 +7,14 @@ from framework.components import Label, Text
 
 from pyglet.window import Window
 
-from engine import SoundManager, StorageManager, Note, Instrument
+from engine import SoundManager, StorageManager, Note, Instrument, Detector
+
+
+# Pitch analysis hop options, mapped to their length in seconds
+ANALYSIS_HOPS: dict[str, float | None] = {
+    (f"{hop * 1000:.0f}ms" if hop is not None else "Every block"): hop
+    for hop in SoundManager.hops
+}
 
 
 class SettingsPage(BorderedRectangle):
@@ -41,6 +48,9 @@ class SettingsPage(BorderedRectangle):
         )
 
         # Input Device
+        # Look for any newly plugged in devices in the background, the dropdown
+        # lists them as soon as they've been found
+        sound_manager.devices.refresh()
         in_device = storage_manager.input_device
         # Check current device is available
         if in_device is None or in_device not in sound_manager.get_available_devices():
@@ -93,6 +103,43 @@ class SettingsPage(BorderedRectangle):
         default_instrument.set_handler("on_picked", self.on_default_instrument_assigned)
         self.add_setting("Default Instrument", default_instrument)
 
+        # Analysis hop, lower powered machines may need to analyse less often
+        analysis_hop = Dropdown(
+            default=next(
+                (
+                    name
+                    for name, hop in ANALYSIS_HOPS.items()
+                    if hop == storage_manager.analysis_hop
+                ),
+                "Please select",
+            ),
+            elements=lambda: list(ANALYSIS_HOPS.keys()),
+            size=Size(
+                matrix=Mat2((1.0, 0.0, 0.0, 1.0)),
+                constant=Vec2(-64.0, -64.0),
+            ),
+            position=Position(),
+            parent=None,
+            window=window,
+        )
+        analysis_hop.set_handler("on_picked", self.on_analysis_hop_assigned)
+        self.add_setting("Analysis Rate", analysis_hop)
+
+        # Pitch detection algorithm
+        pitch_detector = Dropdown(
+            default=storage_manager.pitch_detector.name,
+            elements=lambda: list(Detector.__members__.keys()),
+            size=Size(
+                matrix=Mat2((1.0, 0.0, 0.0, 1.0)),
+                constant=Vec2(-64.0, -64.0),
+            ),
+            position=Position(),
+            parent=None,
+            window=window,
+        )
+        pitch_detector.set_handler("on_picked", self.on_pitch_detector_assigned)
+        self.add_setting("Pitch Detector", pitch_detector)
+
         # Just some helpful info for the user
         self.help_text = Text(
             """The pitch tracker likes harmonics, turn your tone knob up!
@@ -126,6 +173,18 @@ P.S. Make sure to turn the volume of your mic/audio interface all the way up!"""
         instrument = Instrument[option]
         self.storage_manager.default_instrument = instrument
 
+    def on_analysis_hop_assigned(self, option: str):
+        """Relays analysis hop to sound and storage managers."""
+        hop = ANALYSIS_HOPS[option]
+        self.sound_manager.hop = hop
+        self.storage_manager.analysis_hop = hop
+
+    def on_pitch_detector_assigned(self, option: str):
+        """Relays pitch detector to sound and storage managers."""
+        detector = Detector[option]
+        self.sound_manager.detector = detector
+        self.storage_manager.pitch_detector = detector
+
     def add_setting(self, label: str, component: Frame):
         """Adds a new setting entry to the storage manager."""
         position: Position
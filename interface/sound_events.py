@@ -0,0 +1,17 @@
+"""Hooks the engine's `SoundManager` up to pyglet, which the engine itself
+doesn't depend on."""
+
+from pyglet import clock
+
+from engine import SoundManager
+
+
+def attach_sound_manager(sound_manager: SoundManager):
+    """Delivers the sound manager's readings once per frame on pyglet's main
+    loop, so that its events are dispatched on the same thread that draws the
+    interface.
+
+    Components subscribe to its events with `push_handlers`, exactly as they
+    would to any pyglet `EventDispatcher`.
+    """
+    sound_manager.scheduler = clock
@@ -41,6 +41,8 @@ class Tuner(BorderedRectangle):
             parent=parent,
         )
         sound_manager.push_handlers(self)
+        self.sound_manager = sound_manager
+        self.sound_manager.instrument = storage_manager.default_instrument
 
         self.storage_manager = storage_manager
 
@@ -174,8 +176,10 @@ class Tuner(BorderedRectangle):
         match option:
             case Instrument.GUITAR.value.name:
                 self.rebuild_guide(Instrument.GUITAR.value.strings)
+                self.sound_manager.instrument = Instrument.GUITAR
             case Instrument.BASS.value.name:
                 self.rebuild_guide(Instrument.BASS.value.strings)
+                self.sound_manager.instrument = Instrument.BASS
 
     def rebuild_guide(self, strings: list[Pitch]):
         """Rebuilds the guide to show the strings for the selected pitches."""
@@ -5,7 +5,7 @@ from pyglet.gl import GL_NEAREST
 from pyglet.app import run
 from pyglet.clock import schedule_once, unschedule
 from pyglet.math import Vec2
-from pyglet.window import Window
+from pyglet.window import Window, key
 from pyglet import resource
 
 from framework import Frame, Size, Pin, Position
@@ -19,6 +19,8 @@ from interface import (
     Tuner,
     FretboardExplorer,
     Lessons,
+    LatencyOverlay,
+    attach_sound_manager,
 )
 from interface.style import Colours, Sizing
 
@@ -38,6 +40,9 @@ class Root(Frame):
     Also contains the Pyglet window, and sound and storage managers.
     """
 
+    # Debug overlay with the pitch tracker's latency, toggled with F3
+    latency_overlay: LatencyOverlay | None = None
+
     def __init__(self):
         # Load our music font
         resource.add_font("assets/NotoSans-RegularMusic.ttf")
@@ -45,6 +50,11 @@ class Root(Frame):
         # Instantiate our storage and sound managers
         self.storage_manager = StorageManager()
         self.sound_manager = SoundManager()
+        # Events are dispatched on pyglet's main loop
+        attach_sound_manager(self.sound_manager)
+        self.sound_manager.hop = self.storage_manager.analysis_hop
+        self.sound_manager.detector = self.storage_manager.pitch_detector
+        self.sound_manager.instrument = self.storage_manager.default_instrument
 
         # If the user has selected an input device, try to connect to it
         if self.storage_manager.input_device is not None:
@@ -153,6 +163,31 @@ class Root(Frame):
         # Rebuild the UI to reflect the changes
         self.rebuild()
 
+    def on_key_press(self, symbol: int, _modifiers: int):
+        """Called when a key is pressed.
+
+        F3 toggles the latency overlay, and F4 dumps the latency figures to
+        `latency.json`. F5 starts and stops recording the input to
+        `session.rec`, which can be replayed with `python -m engine.analyze`.
+        """
+        if symbol == key.F3:
+            if self.latency_overlay is None:
+                self.latency_overlay = LatencyOverlay(self.sound_manager, self)
+            else:
+                self.latency_overlay.close()
+                self.latency_overlay = None
+            self.rebuild()
+        elif symbol == key.F4:
+            self.sound_manager.latency.dump("latency.json")
+            print("Latency figures written to latency.json")
+        elif symbol == key.F5:
+            if self.sound_manager.recording:
+                self.sound_manager.stop_recording()
+                print("Recording written to session.rec")
+            elif self.sound_manager.sample_rate is not None:
+                self.sound_manager.record("session.rec")
+                print("Recording to session.rec")
+
     def resize(self, _: float, width, height):
         """Called 1/10th of a second after the window was resized."""
         # Update the size of the root frame